@@ -1,12 +1,26 @@
 import streamlit as st
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple, Union
 import logging
+import os
+
+from streamlit.proto.DownloadButton_pb2 import DownloadButton
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from asset_watcher import DIRECTORY_LISTING, get_reloader
+from column_profiler import TableProfile, partition_files, refresh_profile
+from diagram_previews import get_preview
+from export_bundle import read_bundle
+from mermaid_schema import parse_mermaid
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Table extracts used for column profiling: <DATA_DIR>/<layer>/<ENTITY>.csv or <ENTITY>/ partitions
+DATA_DIR = os.environ.get("MEDALLION_DATA_DIR", "data")
+PROFILE_DIR = os.environ.get("MEDALLION_PROFILE_DIR", ".profiles")
+
 # Page configuration
 st.set_page_config(
     page_title="NASM Medallion Architecture",
@@ -87,6 +101,61 @@ def read_svg(path: str) -> Optional[str]:
         logger.error(f"Error reading SVG file {path}: {str(e)}")
         return None
 
+@st.cache_data(show_spinner=False)
+def load_column_profile(layer: str, diagram: str, entity_name: str, partitions_signature: str) -> Optional[List[Dict]]:
+    """Refresh the persisted sketches for one entity and return display rows.
+
+    ``partitions_signature`` only keys the cache: it changes when partition
+    files are added or modified, so unchanged data is served from memory.
+    """
+    entity = parse_mermaid(diagram, layer=layer).entity(entity_name)
+    profile_path = Path(PROFILE_DIR) / layer / f"{entity_name}.json"
+    profile: Optional[TableProfile] = refresh_profile(entity, str(Path(DATA_DIR) / layer), profile_path)
+    return profile.summary() if profile else None
+
+# Watches the .mmd/.svg files; entries below are dropped only for the file that changed
+reloader = get_reloader(".")
+
+def cached_svg(svg_file: str) -> Optional[str]:
+    return reloader.cache.get(svg_file, "svg", lambda: read_svg(svg_file))
+
+def load_preview(svg_file: str, variant: str) -> Optional[bytes]:
+    """Pre-rendered preview of a diagram, kept until the watcher sees the SVG change.
+
+    Previews are never rendered inside a script run (that launches a headless
+    browser); run ``python diagram_previews.py`` to create them ahead of time.
+    """
+    def lookup() -> Optional[bytes]:
+        svg = cached_svg(svg_file)
+        return get_preview(svg, variant, render=False) if svg else None
+    return reloader.cache.get(svg_file, f"preview_{variant}", lookup)
+
+def load_diagram_source(mmd_file: str, embedded: str) -> str:
+    """The .mmd file next to the app if present, so edits show up without a redeploy"""
+    def read() -> str:
+        try:
+            return Path(mmd_file).read_text(encoding="utf-8")
+        except OSError:
+            return embedded
+    return reloader.cache.get(mmd_file, "source", read)
+
+def list_directory() -> List[Tuple[str, int]]:
+    return [(path.name, path.stat().st_size) for path in Path(".").iterdir() if path.is_file()]
+
+# Newer Streamlit builds accept a callable for download data and only invoke it when clicked
+DEFERRED_DOWNLOADS = "deferred_file_id" in DownloadButton.DESCRIPTOR.fields_by_name
+
+def lazy_download_button(label: str, build: Callable[[], Union[str, bytes]], file_name: str, mime: str, key: str):
+    """Download button whose payload is produced only when requested instead of on every rerun"""
+    if DEFERRED_DOWNLOADS:
+        st.download_button(label=label, data=build, file_name=file_name, mime=mime, key=key, on_click="ignore")
+    elif st.session_state.pop(f"prepared_{key}", False):
+        # Shown for this run only, so the payload is sent once rather than on every later rerun
+        st.download_button(label=label, data=build(), file_name=file_name, mime=mime, key=key)
+    elif st.button(f"📦 Prepare {file_name}", key=f"prepare_{key}"):
+        st.session_state[f"prepared_{key}"] = True
+        st.rerun()
+
 # Main title
 st.markdown('<h1 class="main-header">🏗️ NASM Medallion Architecture</h1>', unsafe_allow_html=True)
 
@@ -94,8 +163,12 @@ st.markdown('<h1 class="main-header">🏗️ NASM Medallion Architecture</h1>',
 if 'zoom_level' not in st.session_state:
     st.session_state.zoom_level = 100  # Start at 100% to fill container width
 
+# Show the cached raster preview until the user zooms or asks for the vector diagram
+if 'vector_view' not in st.session_state:
+    st.session_state.vector_view = False
+
 # Sidebar for navigation
-svg_content = read_svg("Snowflake_Logo.svg")
+svg_content = cached_svg("Snowflake_Logo.svg")
 if svg_content:
     st.sidebar.image(svg_content, width=150)
 
@@ -110,23 +183,45 @@ layer_descriptions = {
     "Bronze Layer (Raw Data)": {
         "description": "**Raw Data Ingestion**: Stores data in its original format with minimal transformation. Includes sales transactions, customer data, products, services, certifications, training programs, and social media data from Twitter, TikTok, and Facebook.",
         "color": "#8B4513",
+        "layer": "bronze",
         "file": "bronze_layer_er_diagram.mmd",
         "svg_file": "bronze_layer_er_diagram.svg"
     },
     "Silver Layer (Refined Data)": {
         "description": "**Cleaned & Standardized**: Data quality rules applied, sentiment analysis on social media content, unified schemas, and business key generation. Reference tables for standardized values and data quality scoring.",
         "color": "#C0C0C0",
+        "layer": "silver",
         "file": "silver_layer_er_diagram.mmd",
         "svg_file": "silver_layer_er_diagram.svg"
     },
     "Gold Layer (Modeled Data)": {
         "description": "**Analytics-Ready**: Dimensional model (star schema) with fact tables for Sales, Social Sentiment, and Customer Engagement. Comprehensive dimension tables optimized for business intelligence and reporting.",
         "color": "#FFD700",
+        "layer": "gold",
         "file": "gold_layer_er_diagram.mmd",
         "svg_file": "gold_layer_er_diagram.svg"
     }
 }
 
+# Sidebar thumbnails of every layer
+st.sidebar.markdown("### 🖼️ Layer Previews")
+for layer_name, info in layer_descriptions.items():
+    thumbnail = load_preview(info["svg_file"], "thumbnail")
+    if thumbnail:
+        caption = f"▶ {layer_name}" if layer_name == selected_layer else layer_name
+        st.sidebar.image(thumbnail, caption=caption, width="stretch")
+
+# Every diagram, SVG and document as one zip, built (or served from cache) on click
+st.sidebar.markdown("### 📦 Export")
+with st.sidebar:
+    lazy_download_button(
+        label="⬇️ Download all artifacts (.zip)",
+        build=read_bundle,
+        file_name="medallion_architecture.zip",
+        mime="application/zip",
+        key="export_bundle"
+    )
+
 # Display selected layer info
 layer_info = layer_descriptions[selected_layer]
 st.markdown(f'<div class="layer-description" style="border-left: 4px solid {layer_info["color"]};">{layer_info["description"]}</div>', unsafe_allow_html=True)
@@ -763,10 +858,14 @@ mermaid_diagrams = {
 # Get the current diagram content
 current_file = layer_info["file"]
 current_svg_file = layer_info["svg_file"]
-current_diagram = mermaid_diagrams[current_file]
+current_diagram = load_diagram_source(current_file, mermaid_diagrams[current_file])
+
+# Only sessions showing this layer are rerun when its files change
+run_context = get_script_run_ctx()
+reloader.view(run_context.session_id if run_context else None, [current_file, current_svg_file])
 
 # Create tabs
-tab1, tab2 = st.tabs(["📝 Mermaid Source Code", "📊 SVG Diagram"])
+tab1, tab2, tab3 = st.tabs(["📝 Mermaid Source Code", "📊 SVG Diagram", "🔬 Column Profile"])
 
 with tab1:
     st.subheader(f"📝 {selected_layer} - Mermaid Source")
@@ -776,11 +875,12 @@ with tab1:
     st.code(current_diagram, language="text")
     
     # Download button for the .mmd file
-    st.download_button(
+    lazy_download_button(
         label=f"⬇️ Download {current_file}",
-        data=current_diagram,
+        build=lambda: current_diagram,
         file_name=current_file,
-        mime="text/plain"
+        mime="text/plain",
+        key=f"download_{current_file}"
     )
 
 with tab2:
@@ -790,7 +890,7 @@ with tab2:
     st.markdown(f"**Looking for:** `{current_svg_file}` in application directory")
     
     # Try to read the SVG file using your working method
-    svg_content = read_svg(current_svg_file)
+    svg_content = cached_svg(current_svg_file)
     
     if svg_content:
         st.markdown(f'<div class="success-info">', unsafe_allow_html=True)
@@ -799,59 +899,79 @@ with tab2:
         
         # Zoom and Download controls
         st.markdown("**Diagram Controls:**")
-        col1, col2, col3, col4, col5 = st.columns([1, 1, 1, 1, 1])
+        col1, col2, col3, col4, col5, col6 = st.columns([1, 1, 1, 1, 1, 1])
         
         with col1:
             if st.button("🔍+ Zoom In", key=f"zoom_in_{current_svg_file}"):
+                st.session_state.vector_view = True
                 if st.session_state.zoom_level < 300:
                     st.session_state.zoom_level += 25
-                    st.rerun()
+                st.rerun()
         
         with col2:
             if st.button("🔍- Zoom Out", key=f"zoom_out_{current_svg_file}"):
+                st.session_state.vector_view = True
                 if st.session_state.zoom_level > 50:
                     st.session_state.zoom_level -= 25
-                    st.rerun()
+                st.rerun()
         
         with col3:
             if st.button("🔄 Reset", key=f"zoom_reset_{current_svg_file}"):
                 st.session_state.zoom_level = 100  # Reset to fill container width
+                st.session_state.vector_view = False
                 st.rerun()
         
         with col4:
             st.markdown(f"**Zoom:** {st.session_state.zoom_level}%")
         
         with col5:
-            st.download_button(
+            lazy_download_button(
                 label=f"⬇️ Download",
-                data=svg_content,
+                build=lambda: cached_svg(current_svg_file) or "",
                 file_name=current_svg_file,
-                mime="image/svg+xml"
+                mime="image/svg+xml",
+                key=f"download_{current_svg_file}"
             )
 
-        # Display the SVG with zoom applied
+        with col6:
+            view_label = "🖼️ Preview" if st.session_state.vector_view else "🖱️ Interactive"
+            if st.button(view_label, key=f"view_toggle_{current_svg_file}"):
+                st.session_state.vector_view = not st.session_state.vector_view
+                st.rerun()
+
         st.markdown("---")
+
+        preview = None
+        if not st.session_state.vector_view:
+            preview = load_preview(current_svg_file, "fit")
+
+        if preview:
+            # Lightweight raster preview; the vector diagram is only sent when requested
+            st.image(preview, width="stretch")
+            st.caption("Preview image. Zoom in or choose 🖱️ Interactive for the full vector diagram.")
+        else:
+            # Display the SVG with zoom applied
         
-        # Calculate zoom factor
-        zoom_factor = st.session_state.zoom_level / 100
+            # Calculate zoom factor
+            zoom_factor = st.session_state.zoom_level / 100
         
-        # Display SVG directly with markdown to avoid JavaScript errors
-        # Modify SVG to fill container width
-        if svg_content.startswith('<svg'):
-            # Force SVG to fill container width
-            svg_modified = svg_content.replace('<svg', '<svg width="100%" height="auto"', 1)
-        else:
-            svg_modified = svg_content
+            # Display SVG directly with markdown to avoid JavaScript errors
+            # Modify SVG to fill container width
+            if svg_content.startswith('<svg'):
+                # Force SVG to fill container width
+                svg_modified = svg_content.replace('<svg', '<svg width="100%" height="auto"', 1)
+            else:
+                svg_modified = svg_content
             
-        svg_display_html = f"""
-        <div style="background: white; padding: 20px; border-radius: 8px; border: 2px solid #1f77b4; overflow: auto; height: 1500px; width: 100%; position: relative;">
-            <div style="transform: scale({zoom_factor}); transform-origin: left top; display: inline-block; min-width: 100%;">
-                {svg_modified}
+            svg_display_html = f"""
+            <div style="background: white; padding: 20px; border-radius: 8px; border: 2px solid #1f77b4; overflow: auto; height: 1500px; width: 100%; position: relative;">
+                <div style="transform: scale({zoom_factor}); transform-origin: left top; display: inline-block; min-width: 100%;">
+                    {svg_modified}
+                </div>
             </div>
-        </div>
-        """
+            """
         
-        st.markdown(svg_display_html, unsafe_allow_html=True)
+            st.markdown(svg_display_html, unsafe_allow_html=True)
         
     else:
         st.markdown(f'<div class="error-info">', unsafe_allow_html=True)
@@ -868,12 +988,10 @@ with tab2:
         
         # List files in current directory
         try:
-            current_dir = Path(".")
-            files_in_dir = list(current_dir.iterdir())
+            files_in_dir = reloader.cache.get(DIRECTORY_LISTING, "listing", list_directory)
             st.markdown("**Files in current directory:**")
-            for file_path in files_in_dir:
-                if file_path.is_file():
-                    st.write(f"• `{file_path.name}` ({file_path.stat().st_size} bytes)")
+            for file_name, file_size in files_in_dir:
+                st.write(f"• `{file_name}` ({file_size} bytes)")
         except Exception as e:
             st.write(f"Error listing directory: {e}")
         
@@ -898,6 +1016,32 @@ with tab2:
         3. Refresh the app
         """)
 
+with tab3:
+    st.subheader(f"🔬 {selected_layer} - Column Profile")
+    layer_schema = parse_mermaid(current_diagram, layer=layer_info["layer"])
+    # Every tab body runs on each rerun, so nothing is profiled until a table is chosen
+    selected_entity = st.selectbox("Select Table:", list(layer_schema.entities), index=None,
+                                   placeholder="Choose a table to profile", key=f"profile_entity_{current_file}")
+    layer_data_dir = Path(DATA_DIR) / layer_info["layer"]
+
+    if selected_entity is None:
+        st.info("Choose a table to profile its columns.")
+    else:
+        st.markdown(f"**Data source:** `{layer_data_dir}/{selected_entity}`")
+
+        partitions = partition_files(str(layer_data_dir), selected_entity)
+        signature = "|".join(sorted(partitions))
+        with st.spinner("Profiling new partitions..."):
+            profile_rows = load_column_profile(layer_info["layer"], current_diagram, selected_entity, signature)
+
+        if profile_rows:
+            st.markdown(f"**Rows profiled:** {max(row['rows'] for row in profile_rows):,} across {len(partitions)} partition file(s)")
+            st.dataframe(profile_rows, width="stretch", hide_index=True)
+            st.caption("Distinct counts (HyperLogLog), quantiles (KLL) and top values (Misra-Gries) are approximate.")
+        else:
+            st.info(f"No data found for `{selected_entity}`. Place CSV extracts in `{layer_data_dir}` "
+                    f"(set `MEDALLION_DATA_DIR` to change the location).")
+
 # Sidebar information
 st.sidebar.markdown("---")
 st.sidebar.markdown("### 📋 Legend")
@@ -0,0 +1,144 @@
+"""Arrow schemas for every entity declared in the layer diagrams.
+
+The ``.mmd`` files only declare logical types (``string``, ``decimal``,
+``int``, ``datetime``, ``date``, ``boolean``). The registry pins each one to a
+physical Arrow type with concrete decimal precision and timestamp units, and
+stores low-cardinality string columns (standardised codes, categories,
+platforms, sources) dictionary-encoded. ``conform`` casts a record batch onto
+a registry schema column by column, passing through any column whose type
+already matches without copying it.
+
+Requires ``pyarrow``.
+"""
+
+import logging
+from typing import Dict, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from mermaid_schema import Attribute, Entity, LayerSchema, load_all_layers
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_UNIT = "us"
+TIMESTAMP_TZ = "UTC"
+DICTIONARY_TYPE = pa.dictionary(pa.int32(), pa.string())
+
+BASE_TYPES = {
+    "string": pa.string(),
+    "decimal": pa.decimal128(18, 2),
+    "int": pa.int64(),
+    "datetime": pa.timestamp(TIMESTAMP_UNIT, tz=TIMESTAMP_TZ),
+    "date": pa.date32(),
+    "boolean": pa.bool_(),
+}
+
+# Scores and confidences are bounded fractions; coordinates need six decimals
+DECIMAL_OVERRIDES = {
+    "sentiment_score": pa.decimal128(6, 4),
+    "avg_sentiment_score": pa.decimal128(6, 4),
+    "sentiment_confidence": pa.decimal128(6, 4),
+    "confidence_score": pa.decimal128(6, 4),
+    "positive_score": pa.decimal128(6, 4),
+    "negative_score": pa.decimal128(6, 4),
+    "neutral_score": pa.decimal128(6, 4),
+    "min_score": pa.decimal128(6, 4),
+    "max_score": pa.decimal128(6, 4),
+    "latitude": pa.decimal128(9, 6),
+    "longitude": pa.decimal128(9, 6),
+}
+
+# Low-cardinality string columns stored as dictionaries. Standardised ``*_std``
+# columns are included automatically.
+DICTIONARY_COLUMNS = {
+    "payment_method", "sales_channel", "transaction_type", "currency_code",
+    "sentiment_category", "overall_sentiment", "brand_mention_type", "content_category",
+    "platform", "platform_std", "platform_name", "platform_category", "platform_type",
+    "customer_type", "customer_tier", "engagement_tier", "lifecycle_stage", "age_group", "gender",
+    "state", "state_code", "country", "country_code", "region", "territory", "market_size", "time_zone",
+    "status", "product_category", "product_subcategory", "service_type", "service_category",
+    "certification_level", "certification_type", "training_type", "training_category", "format",
+    "delivery_method", "difficulty_level", "post_type", "content_language", "sentiment_engine",
+    "source_system", "source_api",
+}
+
+
+def arrow_type(attribute: Attribute) -> pa.DataType:
+    """Physical Arrow type for one diagram attribute"""
+    if attribute.type == "string" and (attribute.name in DICTIONARY_COLUMNS or attribute.name.endswith("_std")):
+        return DICTIONARY_TYPE
+    if attribute.type == "decimal" and attribute.name in DECIMAL_OVERRIDES:
+        return DECIMAL_OVERRIDES[attribute.name]
+    try:
+        return BASE_TYPES[attribute.type]
+    except KeyError:
+        raise ValueError(f"No Arrow mapping for diagram type '{attribute.type}' ({attribute.name})") from None
+
+
+def entity_schema(entity: Entity, layer: str = "") -> pa.Schema:
+    """Build the Arrow schema for an entity, keeping key flags and logical types as field metadata"""
+    fields = []
+    for attribute in entity.attributes:
+        metadata = {"logical_type": attribute.type}
+        if attribute.keys:
+            metadata["keys"] = ",".join(attribute.keys)
+        nullable = not attribute.is_primary_key
+        fields.append(pa.field(attribute.name, arrow_type(attribute), nullable=nullable, metadata=metadata))
+    return pa.schema(fields, metadata={"entity": entity.name, "layer": layer})
+
+
+class SchemaRegistry:
+    """Arrow schemas for every entity of the Bronze, Silver and Gold diagrams"""
+
+    def __init__(self, layers: Optional[Dict[str, LayerSchema]] = None):
+        self.layers = layers if layers is not None else load_all_layers()
+        self._schemas: Dict[str, pa.Schema] = {}
+        for layer, schema in self.layers.items():
+            for entity in schema.entities.values():
+                self._schemas[entity.name] = entity_schema(entity, layer)
+
+    def __contains__(self, entity_name: str) -> bool:
+        return entity_name in self._schemas
+
+    def schema(self, entity_name: str) -> pa.Schema:
+        try:
+            return self._schemas[entity_name]
+        except KeyError:
+            raise KeyError(f"Entity {entity_name} is not defined in any layer diagram") from None
+
+    def empty_batch(self, entity_name: str) -> pa.RecordBatch:
+        return pa.RecordBatch.from_pylist([], schema=self.schema(entity_name))
+
+    def conform(self, entity_name: str, batch: pa.RecordBatch) -> pa.RecordBatch:
+        return conform(batch, self.schema(entity_name))
+
+
+def conform_array(array: pa.Array, target: pa.DataType) -> pa.Array:
+    """Cast one column to the target type, returning it untouched if it already matches"""
+    if array.type == target:
+        return array
+    if pa.types.is_dictionary(target):
+        if pa.types.is_dictionary(array.type):
+            return pc.cast(array, target)
+        return pc.cast(pc.dictionary_encode(pc.cast(array, target.value_type)), target)
+    if pa.types.is_dictionary(array.type):
+        array = array.dictionary_decode()
+    if pa.types.is_decimal(target) and pa.types.is_floating(array.type):
+        # Round first so binary float noise does not make the cast lossy
+        array = pc.round(array, ndigits=target.scale)
+        return pc.cast(array, target, safe=False)
+    return pc.cast(array, target)
+
+
+def conform(batch: pa.RecordBatch, schema: pa.Schema) -> pa.RecordBatch:
+    """Project and cast a batch onto a schema; missing columns become nulls, extra columns are dropped"""
+    arrays = []
+    for target in schema:
+        index = batch.schema.get_field_index(target.name)
+        if index == -1:
+            arrays.append(pa.nulls(batch.num_rows, type=target.type))
+        else:
+            arrays.append(conform_array(batch.column(index), target.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
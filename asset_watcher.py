@@ -0,0 +1,267 @@
+"""Watch the diagram assets and invalidate only what a changed file affects.
+
+A background thread watches the app directory for ``.mmd`` and ``.svg``
+changes. On Linux it uses inotify through ``ctypes``, so edits are seen as
+soon as the editor closes or renames the file. Elsewhere, or if inotify is
+unavailable, it falls back to polling file modification times.
+
+Derived values (file contents, previews, the directory listing shown when an
+SVG is missing) live in an ``AssetCache`` keyed by file name, so a change
+drops the entries of that one file instead of clearing every cache. Sessions
+register the files they are showing, and only those sessions are asked to
+rerun when one of the files changes.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WATCHED_SUFFIXES = (".mmd", ".svg")
+DEBOUNCE_SECONDS = 0.1
+POLL_INTERVAL_SECONDS = 1.0
+
+# Cache entries that depend on the whole directory rather than one file
+DIRECTORY_LISTING = "<directory>"
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+IN_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+ChangeCallback = Callable[[Set[str]], None]
+
+
+class AssetCache:
+    """Thread-safe cache of values derived from one file, invalidated per file
+
+    Loads run outside the lock, so each file has a generation counter that
+    ``invalidate`` bumps. A value is only stored if its file's generation is
+    unchanged since the load started; otherwise it was computed from content
+    that has since changed, and the next ``get`` loads it again.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[Hashable, object]] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, file_name: str, key: Hashable, load: Callable[[], object]):
+        with self._lock:
+            entries = self._entries.get(file_name, {})
+            if key in entries:
+                return entries[key]
+            generation = self._generations.get(file_name, 0)
+        value = load()
+        with self._lock:
+            if self._generations.get(file_name, 0) == generation:
+                self._entries.setdefault(file_name, {})[key] = value
+        return value
+
+    def invalidate(self, file_name: str) -> None:
+        with self._lock:
+            self._entries.pop(file_name, None)
+            self._generations[file_name] = self._generations.get(file_name, 0) + 1
+
+
+class _WatcherThread(threading.Thread):
+    def __init__(self, directory: str, on_change: ChangeCallback, suffixes: Tuple[str, ...]):
+        super().__init__(daemon=True, name=type(self).__name__)
+        self.directory = Path(directory)
+        self.on_change = on_change
+        self.suffixes = suffixes
+        self._stop_event = threading.Event()
+
+    def _is_watched(self, name: str) -> bool:
+        return name.endswith(self.suffixes)
+
+    def _dispatch(self, names: Set[str]) -> None:
+        if not names:
+            return
+        try:
+            self.on_change(names)
+        except Exception as e:
+            logger.error(f"Error handling changes to {sorted(names)}: {str(e)}")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+class InotifyWatcher(_WatcherThread):
+    """Directory watch through the Linux inotify API, called via ctypes"""
+
+    def __init__(self, directory: str, on_change: ChangeCallback, suffixes: Tuple[str, ...] = WATCHED_SUFFIXES):
+        super().__init__(directory, on_change, suffixes)
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(self.directory), IN_WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {self.directory}")
+
+    def _read_names(self) -> Set[str]:
+        names = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if self._is_watched(name):
+                names.add(name)
+        return names
+
+    def run(self) -> None:
+        try:
+            while not self._stop_event.is_set():
+                ready, _, _ = select.select([self.fd], [], [], 0.5)
+                if not ready:
+                    continue
+                # Editors often write, rename and touch in quick succession; report them together
+                names = self._read_names()
+                deadline = time.monotonic() + DEBOUNCE_SECONDS
+                while (remaining := deadline - time.monotonic()) > 0:
+                    if select.select([self.fd], [], [], remaining)[0]:
+                        names |= self._read_names()
+                self._dispatch(names)
+        finally:
+            os.close(self.fd)
+
+
+class PollingWatcher(_WatcherThread):
+    """Fallback that compares modification times and sizes on an interval"""
+
+    def __init__(self, directory: str, on_change: ChangeCallback, suffixes: Tuple[str, ...] = WATCHED_SUFFIXES,
+                 interval: float = POLL_INTERVAL_SECONDS):
+        super().__init__(directory, on_change, suffixes)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        try:
+            for entry in os.scandir(self.directory):
+                if self._is_watched(entry.name) and entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        except OSError as e:
+            logger.warning(f"Cannot scan {self.directory}: {str(e)}")
+        return snapshot
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            snapshot = self._scan()
+            changed = {name for name in snapshot.keys() | self._snapshot.keys()
+                       if snapshot.get(name) != self._snapshot.get(name)}
+            self._snapshot = snapshot
+            self._dispatch(changed)
+
+
+def start_watcher(directory: str, on_change: ChangeCallback,
+                  suffixes: Tuple[str, ...] = WATCHED_SUFFIXES) -> _WatcherThread:
+    """Start an inotify watcher where available, otherwise a polling one"""
+    watcher: Optional[_WatcherThread] = None
+    if sys.platform.startswith("linux"):
+        try:
+            watcher = InotifyWatcher(directory, on_change, suffixes)
+        except (OSError, AttributeError) as e:
+            logger.warning(f"inotify unavailable ({e}); polling {directory} for changes")
+    if watcher is None:
+        watcher = PollingWatcher(directory, on_change, suffixes)
+    watcher.start()
+    return watcher
+
+
+def request_session_rerun(session_id: str) -> bool:
+    """Ask a Streamlit session to rerun with its last client state; False if it is gone
+
+    Streamlit has no public API for rerunning another session, so this uses
+    the private ``Runtime._session_mgr`` (checked against Streamlit 1.66 by
+    ``test_asset_watcher.py``). If it is missing, viewers simply see the
+    change on their next interaction.
+    """
+    try:
+        from streamlit.runtime import Runtime
+
+        if not Runtime.exists():
+            return False
+        session_mgr = getattr(Runtime.instance(), "_session_mgr", None)
+        if session_mgr is None:
+            logger.warning("This Streamlit version has no Runtime._session_mgr; sessions are not rerun on changes")
+            return False
+        info = session_mgr.get_active_session_info(session_id)
+        if info is None:
+            return False
+        info.session.request_rerun(None)
+        return True
+    except Exception as e:
+        logger.warning(f"Could not rerun session {session_id}: {str(e)}")
+        return False
+
+
+class HotReloader:
+    """Connects a watcher to an AssetCache and to the sessions viewing each file"""
+
+    def __init__(self, directory: str = ".", rerun: Callable[[str], bool] = request_session_rerun):
+        self.directory = directory
+        self.cache = AssetCache()
+        self.rerun = rerun
+        self._viewers: Dict[str, Set[str]] = {}  # session id -> file names it is showing
+        self._lock = threading.Lock()
+        self.watcher = start_watcher(directory, self.handle_changes)
+
+    def view(self, session_id: Optional[str], file_names: Iterable[str]) -> None:
+        """Record the files a session currently shows, replacing what it showed before"""
+        if session_id:
+            with self._lock:
+                self._viewers[session_id] = set(file_names)
+
+    def handle_changes(self, file_names: Set[str]) -> None:
+        for file_name in file_names:
+            self.cache.invalidate(file_name)
+        self.cache.invalidate(DIRECTORY_LISTING)
+
+        with self._lock:
+            sessions = [sid for sid, viewing in self._viewers.items() if viewing & file_names]
+        logger.info(f"Assets changed: {', '.join(sorted(file_names))}; refreshing {len(sessions)} session(s)")
+        for session_id in sessions:
+            if not self.rerun(session_id):
+                with self._lock:
+                    self._viewers.pop(session_id, None)
+
+    def stop(self) -> None:
+        self.watcher.stop()
+
+
+_reloaders: Dict[str, HotReloader] = {}
+_reloaders_lock = threading.Lock()
+
+
+def get_reloader(directory: str = ".") -> HotReloader:
+    """Process-wide reloader for a directory; the watcher thread is started once"""
+    key = os.path.abspath(directory)
+    with _reloaders_lock:
+        if key not in _reloaders:
+            _reloaders[key] = HotReloader(directory)
+        return _reloaders[key]
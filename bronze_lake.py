@@ -0,0 +1,326 @@
+"""Partitioned Parquet storage for Bronze tables with manifest-based pruning.
+
+Every Bronze table carries ``ingested_at`` and a ``source_system`` or
+``source_api`` column. Batches are written to a hive-style layout::
+
+    <root>/<TABLE>/ingest_date=2025-07-21/source=twitter_api/part-<id>.parquet
+
+Each table keeps a ``_manifest.json`` recording every file's partition values,
+row count, size and per-column min/max statistics. Scans prune first by
+partition, then by file statistics from the manifest, and finally by Parquet
+row-group statistics, so a Silver load that only needs yesterday's Twitter
+data opens only those files.
+
+Rows without an ``ingested_at`` or source value land in an
+``__unknown__`` partition rather than being dropped. Manifest updates from
+writers and compaction are serialised by an exclusive lock on
+``_manifest.lock`` in the table directory, so several processes can write
+to the same table safely.
+
+When constructed with a ``SchemaRegistry`` the lake conforms every batch to
+the table's Arrow schema before writing, so files carry the registry's
+decimal precision, timestamp units and dictionary-encoded columns.
+
+Requires ``pyarrow``.
+"""
+
+import datetime as dt
+import json
+import logging
+import os
+import re
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from arrow_schema import SchemaRegistry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "_manifest.json"
+LOCK_NAME = "_manifest.lock"
+UNKNOWN_PARTITION = "__unknown__"
+INGESTED_AT_COLUMN = "ingested_at"
+SOURCE_COLUMNS = ("source_system", "source_api")
+DEFAULT_ROW_GROUP_SIZE = 128 * 1024
+SMALL_FILE_BYTES = 16 * 1024 * 1024
+
+# Free-text and raw payload columns are not useful for min/max pruning
+UNSTATS_COLUMNS = {"raw_data_json"}
+
+Predicate = Tuple[str, str, Any]
+
+
+def _partition_value(value: Optional[str]) -> str:
+    """Make a source name safe to use as a directory name"""
+    if not value:
+        return UNKNOWN_PARTITION
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", value.strip().lower())
+
+
+def _comparable(value: Any) -> Any:
+    """Normalise a value to the representation stored in the manifest"""
+    if isinstance(value, (dt.datetime, dt.date)):
+        return value.isoformat()
+    return value
+
+
+def _matches(min_value: Any, max_value: Any, op: str, value: Any) -> bool:
+    """Could a file whose column lies in [min_value, max_value] contain a row satisfying the predicate?"""
+    if min_value is None or max_value is None:
+        return True
+    try:
+        if op in ("=", "=="):
+            return min_value <= value <= max_value
+        if op == "in":
+            return any(min_value <= v <= max_value for v in value)
+        if op == "<":
+            return min_value < value
+        if op == "<=":
+            return min_value <= value
+        if op == ">":
+            return max_value > value
+        if op == ">=":
+            return max_value >= value
+    except TypeError:
+        return True
+    return True
+
+
+class BronzeLake:
+    """Writer and pruning reader for one lake root directory"""
+
+    def __init__(self, root: Union[str, Path], row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                 registry: Optional[SchemaRegistry] = None):
+        self.root = Path(root)
+        self.row_group_size = row_group_size
+        self.registry = registry
+
+    # Manifest handling
+
+    def _table_dir(self, table: str) -> Path:
+        return self.root / table
+
+    def load_manifest(self, table: str) -> List[Dict]:
+        path = self._table_dir(table) / MANIFEST_NAME
+        if not path.exists():
+            return []
+        return json.loads(path.read_text(encoding="utf-8"))["files"]
+
+    @contextmanager
+    def _manifest_lock(self, table: str) -> Iterator[None]:
+        """Hold an exclusive lock on the table's manifest for a read-modify-write"""
+        table_dir = self._table_dir(table)
+        table_dir.mkdir(parents=True, exist_ok=True)
+        with open(table_dir / LOCK_NAME, "a+b") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _save_manifest(self, table: str, files: List[Dict]) -> None:
+        table_dir = self._table_dir(table)
+        table_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = table_dir / f"{MANIFEST_NAME}.{uuid.uuid4().hex}.tmp"
+        tmp_path.write_text(json.dumps({"table": table, "files": files}, indent=1), encoding="utf-8")
+        os.replace(tmp_path, table_dir / MANIFEST_NAME)
+
+    # Writing
+
+    @staticmethod
+    def source_column(schema: pa.Schema) -> str:
+        for column in SOURCE_COLUMNS:
+            if column in schema.names:
+                return column
+        raise ValueError(f"Bronze batch has none of the partition columns {SOURCE_COLUMNS}")
+
+    @staticmethod
+    def _column_stats(table: pa.Table) -> Dict[str, List[Any]]:
+        stats = {}
+        for name, column in zip(table.column_names, table.columns):
+            if name in UNSTATS_COLUMNS or not (
+                pa.types.is_integer(column.type) or pa.types.is_floating(column.type)
+                or pa.types.is_decimal(column.type) or pa.types.is_temporal(column.type)
+                or pa.types.is_string(column.type)
+            ):
+                continue
+            min_max = pc.min_max(column)
+            low, high = min_max["min"].as_py(), min_max["max"].as_py()
+            if pa.types.is_decimal(column.type) and low is not None:
+                low, high = float(low), float(high)
+            stats[name] = [_comparable(low), _comparable(high)]
+        return stats
+
+    def _write_file(self, table_name: str, ingest_date: str, source: str, data: pa.Table) -> Dict:
+        relative = Path(f"ingest_date={ingest_date}") / f"source={source}" / f"part-{uuid.uuid4().hex}.parquet"
+        path = self._table_dir(table_name) / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(data, path, row_group_size=self.row_group_size, compression="zstd", write_statistics=True)
+        return {
+            "path": relative.as_posix(),
+            "ingest_date": ingest_date,
+            "source": source,
+            "rows": data.num_rows,
+            "bytes": path.stat().st_size,
+            "stats": self._column_stats(data),
+        }
+
+    def write_batch(self, table_name: str, batch: Union[pa.Table, pa.RecordBatch]) -> List[Dict]:
+        """Split a batch by ingest date and source, write one file per partition and update the manifest"""
+        data = pa.Table.from_batches([batch]) if isinstance(batch, pa.RecordBatch) else batch
+        if data.num_rows == 0:
+            return []
+        if self.registry is not None and table_name in self.registry:
+            schema = self.registry.schema(table_name)
+            data = pa.Table.from_batches([self.registry.conform(table_name, b) for b in data.to_batches()],
+                                         schema=schema)
+        source_column = self.source_column(data.schema)
+        ingest_dates = pc.fill_null(pc.strftime(data[INGESTED_AT_COLUMN], format="%Y-%m-%d"), UNKNOWN_PARTITION)
+        sources = data[source_column]
+
+        keys = pa.table({"ingest_date": ingest_dates, "source": sources}).group_by(
+            ["ingest_date", "source"]).aggregate([]).to_pylist()
+        written = []
+        for key in keys:
+            source_filter = (pc.is_null(sources) if key["source"] is None
+                             else pc.equal(sources, key["source"]))
+            mask = pc.and_(pc.equal(ingest_dates, key["ingest_date"]), source_filter)
+            written.append(self._write_file(table_name, key["ingest_date"],
+                                            _partition_value(key["source"]), data.filter(mask)))
+
+        with self._manifest_lock(table_name):
+            self._save_manifest(table_name, self.load_manifest(table_name) + written)
+        logger.info(f"Wrote {data.num_rows} rows of {table_name} into {len(written)} partition files")
+        return written
+
+    def compact(self, table_name: str, small_file_bytes: int = SMALL_FILE_BYTES) -> int:
+        """Merge the small files of each partition into one file; returns the number of files removed
+
+        Files are merged outside the manifest lock so writers are not blocked.
+        A merged file is only published if all of its inputs are still in the
+        manifest; otherwise another compaction got there first and it is discarded.
+        """
+        with self._manifest_lock(table_name):
+            files = self.load_manifest(table_name)
+        by_partition: Dict[Tuple[str, str], List[Dict]] = {}
+        for entry in files:
+            if entry["bytes"] < small_file_bytes:
+                by_partition.setdefault((entry["ingest_date"], entry["source"]), []).append(entry)
+
+        merged_files = []
+        for (ingest_date, source), entries in by_partition.items():
+            if len(entries) < 2:
+                continue
+            try:
+                merged = pa.concat_tables(
+                    [pq.read_table(self._table_dir(table_name) / e["path"]) for e in entries],
+                    promote_options="default",
+                )
+            except FileNotFoundError:
+                continue  # already merged by a concurrent compaction
+            merged_files.append((entries, self._write_file(table_name, ingest_date, source, merged)))
+
+        replaced, discarded = [], []
+        with self._manifest_lock(table_name):
+            current = self.load_manifest(table_name)
+            live = {entry["path"] for entry in current}
+            for entries, merged_entry in merged_files:
+                inputs = {entry["path"] for entry in entries}
+                if inputs <= live:
+                    live -= inputs
+                    current = [entry for entry in current if entry["path"] not in inputs] + [merged_entry]
+                    replaced.extend(inputs)
+                else:
+                    discarded.append(merged_entry["path"])
+            # Publish the new manifest before deleting anything so readers never see missing files
+            self._save_manifest(table_name, current)
+
+        for path in replaced + discarded:
+            (self._table_dir(table_name) / path).unlink(missing_ok=True)
+        if replaced:
+            logger.info(f"Compacted {len(replaced)} small files of {table_name}")
+        return len(replaced)
+
+    # Reading
+
+    def plan(self, table_name: str, ingest_dates: Optional[Iterable[Union[str, dt.date]]] = None,
+             sources: Optional[Iterable[str]] = None, predicates: Sequence[Predicate] = ()) -> List[Dict]:
+        """Return the manifest entries that may contain matching rows"""
+        wanted_dates = {_comparable(d) for d in ingest_dates} if ingest_dates is not None else None
+        wanted_sources = {_partition_value(s) for s in sources} if sources is not None else None
+        selected = []
+        for entry in self.load_manifest(table_name):
+            if wanted_dates is not None and entry["ingest_date"] not in wanted_dates:
+                continue
+            if wanted_sources is not None and entry["source"] not in wanted_sources:
+                continue
+            stats = entry.get("stats", {})
+            if all(
+                column not in stats
+                or _matches(stats[column][0], stats[column][1], op,
+                            [_comparable(v) for v in value] if op == "in" else _comparable(value))
+                for column, op, value in predicates
+            ):
+                selected.append(entry)
+        return selected
+
+    @staticmethod
+    def _filters(predicates: Sequence[Predicate], schema: pa.Schema) -> Optional[List[Predicate]]:
+        """Parquet filters with each literal cast to its column's type, e.g. ``0`` to ``decimal128(18, 2)``"""
+        filters = []
+        for column, op, value in predicates:
+            if column in schema.names:
+                value_type = schema.field(column).type
+                if pa.types.is_dictionary(value_type):
+                    value_type = value_type.value_type
+                value = pa.array(value, type=value_type) if op == "in" else pa.scalar(value, type=value_type)
+            filters.append((column, "==" if op == "=" else op, value))
+        return filters or None
+
+    def _read_file(self, table_name: str, entry: Dict, predicates: Sequence[Predicate],
+                   columns: Optional[List[str]]) -> pa.Table:
+        path = self._table_dir(table_name) / entry["path"]
+        if self.registry is not None and table_name in self.registry:
+            schema = self.registry.schema(table_name)
+        else:
+            schema = pq.read_schema(path)
+        return pq.read_table(path, columns=columns, filters=self._filters(predicates, schema))
+
+    def iter_batches(self, table_name: str, ingest_dates: Optional[Iterable[Union[str, dt.date]]] = None,
+                     sources: Optional[Iterable[str]] = None, predicates: Sequence[Predicate] = (),
+                     columns: Optional[List[str]] = None) -> Iterator[pa.RecordBatch]:
+        """Stream matching record batches file by file instead of materialising one table"""
+        for entry in self.plan(table_name, ingest_dates, sources, predicates):
+            yield from self._read_file(table_name, entry, predicates, columns).to_batches()
+
+    def scan(self, table_name: str, ingest_dates: Optional[Iterable[Union[str, dt.date]]] = None,
+             sources: Optional[Iterable[str]] = None, predicates: Sequence[Predicate] = (),
+             columns: Optional[List[str]] = None) -> pa.Table:
+        """Read matching rows, touching only the files and row groups that can contain them"""
+        entries = self.plan(table_name, ingest_dates, sources, predicates)
+        tables = [self._read_file(table_name, entry, predicates, columns) for entry in entries]
+        logger.info(f"Scanning {len(entries)} files for {table_name}")
+        if not tables:
+            return pa.table({})
+        return pa.concat_tables(tables, promote_options="default")
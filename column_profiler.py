@@ -0,0 +1,401 @@
+"""Approximate, mergeable column profiles for the tables in the layer diagrams.
+
+Each column is summarised in one streaming pass by small sketches that can be
+merged without revisiting data:
+
+* ``HyperLogLog`` for distinct counts
+* ``KLLSketch`` for quantiles of numeric and temporal columns
+* ``TopK`` (Misra-Gries) for frequent values
+* exact row, null, min and max counters
+
+Profiles are persisted as JSON per entity. Table data is read from CSV files,
+either ``<data_dir>/<ENTITY>.csv`` or a directory ``<data_dir>/<ENTITY>/``
+whose files are treated as partitions. When only new partitions have
+appeared, they are profiled and merged into the stored profile; if an already
+profiled file changed or disappeared, the profile is rebuilt.
+
+Usage:
+    python column_profiler.py gold data/gold --profile-dir .profiles/gold
+"""
+
+import argparse
+import base64
+import csv
+import datetime as dt
+import gzip
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import sys
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from mermaid_schema import LAYER_FILES, Entity, load_layer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HLL_PRECISION = 12
+KLL_K = 200
+TOPK_CAPACITY = 32
+NUMERIC_TYPES = {"int", "decimal"}
+TEMPORAL_TYPES = {"date", "datetime"}
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter with 2**precision one-byte registers"""
+
+    def __init__(self, precision: int = HLL_PRECISION, registers: Optional[bytearray] = None):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = registers if registers is not None else bytearray(self.m)
+
+    def add(self, value: str) -> None:
+        h = _hash64(value)
+        index = h >> (64 - self.precision)
+        remainder = (h << self.precision) & ((1 << 64) - 1)
+        rank = min(65 - remainder.bit_length(), 65 - self.precision) if remainder else 65 - self.precision
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+        return self
+
+    def estimate(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+    def to_json(self) -> Dict:
+        return {"p": self.precision, "registers": base64.b64encode(bytes(self.registers)).decode("ascii")}
+
+    @classmethod
+    def from_json(cls, data: Mapping) -> "HyperLogLog":
+        return cls(data["p"], bytearray(base64.b64decode(data["registers"])))
+
+
+class KLLSketch:
+    """KLL quantile sketch: a stack of compactors where level h items each weigh 2**h"""
+
+    def __init__(self, k: int = KLL_K, levels: Optional[List[List[float]]] = None, seed: int = 0):
+        self.k = k
+        self.levels: List[List[float]] = levels if levels is not None else [[]]
+        self._rng = random.Random(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        for level in range(len(self.levels)):
+            if len(self.levels[level]) >= self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append([])
+                items = sorted(self.levels[level])
+                offset = self._rng.randint(0, 1)
+                self.levels[level + 1].extend(items[offset::2])
+                self.levels[level] = []
+
+    def add(self, value: float) -> None:
+        self.levels[0].append(value)
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self._compress()
+        return self
+
+    def quantiles(self, fractions: Sequence[float]) -> List[Optional[float]]:
+        weighted = sorted((item, 1 << level) for level, items in enumerate(self.levels) for item in items)
+        total = sum(weight for _, weight in weighted)
+        if not total:
+            return [None for _ in fractions]
+        results = []
+        for fraction in fractions:
+            target = fraction * total
+            cumulative = 0
+            answer = weighted[-1][0]
+            for item, weight in weighted:
+                cumulative += weight
+                if cumulative >= target:
+                    answer = item
+                    break
+            results.append(answer)
+        return results
+
+    def to_json(self) -> Dict:
+        return {"k": self.k, "levels": self.levels}
+
+    @classmethod
+    def from_json(cls, data: Mapping) -> "KLLSketch":
+        return cls(data["k"], [list(level) for level in data["levels"]])
+
+
+class TopK:
+    """Misra-Gries frequent items summary; counts are lower bounds"""
+
+    def __init__(self, capacity: int = TOPK_CAPACITY, counters: Optional[Dict[str, int]] = None):
+        self.capacity = capacity
+        self.counters: Dict[str, int] = counters if counters is not None else {}
+
+    def add(self, value: str, count: int = 1) -> None:
+        if value in self.counters or len(self.counters) < self.capacity:
+            self.counters[value] = self.counters.get(value, 0) + count
+            return
+        self._decrement(count)
+
+    def _decrement(self, amount: int) -> None:
+        self.counters = {key: c - amount for key, c in self.counters.items() if c > amount}
+
+    def merge(self, other: "TopK") -> "TopK":
+        for value, count in other.counters.items():
+            self.counters[value] = self.counters.get(value, 0) + count
+        if len(self.counters) > self.capacity:
+            cutoff = sorted(self.counters.values(), reverse=True)[self.capacity]
+            self._decrement(cutoff)
+        return self
+
+    def top(self, n: int = 5) -> List[Tuple[str, int]]:
+        return sorted(self.counters.items(), key=lambda item: (-item[1], item[0]))[:n]
+
+    def to_json(self) -> Dict:
+        return {"capacity": self.capacity, "counters": self.counters}
+
+    @classmethod
+    def from_json(cls, data: Mapping) -> "TopK":
+        return cls(data["capacity"], dict(data["counters"]))
+
+
+def _numeric(value: str, column_type: str) -> Optional[float]:
+    """Map a raw value onto a number for quantiles; temporal values become epoch seconds"""
+    try:
+        if column_type in NUMERIC_TYPES:
+            return float(value)
+        if column_type in TEMPORAL_TYPES:
+            parsed = dt.datetime.fromisoformat(value)
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=dt.timezone.utc)
+            return parsed.timestamp()
+    except ValueError:
+        return None
+    return None
+
+
+def format_value(value: Optional[float], column_type: str) -> Optional[str]:
+    """Render a sketch value back in the column's logical type"""
+    if value is None:
+        return None
+    if column_type == "date":
+        return dt.datetime.fromtimestamp(value, dt.timezone.utc).date().isoformat()
+    if column_type == "datetime":
+        return dt.datetime.fromtimestamp(value, dt.timezone.utc).isoformat(sep=" ", timespec="seconds")
+    if column_type == "int":
+        return str(int(value))
+    return f"{value:.4g}"
+
+
+@dataclass
+class ColumnProfile:
+    """Mergeable statistics for one column"""
+
+    name: str
+    type: str
+    rows: int = 0
+    nulls: int = 0
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    distinct: HyperLogLog = field(default_factory=HyperLogLog)
+    quantiles: KLLSketch = field(default_factory=KLLSketch)
+    top_values: TopK = field(default_factory=TopK)
+
+    def add(self, value: Optional[str]) -> None:
+        self.rows += 1
+        if value is None or value == "":
+            self.nulls += 1
+            return
+        self.distinct.add(value)
+        self.top_values.add(value)
+        number = _numeric(value, self.type)
+        if number is not None:
+            self.quantiles.add(number)
+            self.min_value = number if self.min_value is None else min(self.min_value, number)
+            self.max_value = number if self.max_value is None else max(self.max_value, number)
+
+    def merge(self, other: "ColumnProfile") -> "ColumnProfile":
+        self.rows += other.rows
+        self.nulls += other.nulls
+        for bound, pick in (("min_value", min), ("max_value", max)):
+            values = [v for v in (getattr(self, bound), getattr(other, bound)) if v is not None]
+            setattr(self, bound, pick(values) if values else None)
+        self.distinct.merge(other.distinct)
+        self.quantiles.merge(other.quantiles)
+        self.top_values.merge(other.top_values)
+        return self
+
+    def summary(self) -> Dict:
+        """Flat, display-ready statistics"""
+        p05, p50, p95 = self.quantiles.quantiles([0.05, 0.5, 0.95])
+        return {
+            "column": self.name,
+            "type": self.type,
+            "rows": self.rows,
+            "null_rate": round(self.nulls / self.rows, 4) if self.rows else 0.0,
+            "distinct_approx": self.distinct.estimate(),
+            "min": format_value(self.min_value, self.type),
+            "p05": format_value(p05, self.type),
+            "median": format_value(p50, self.type),
+            "p95": format_value(p95, self.type),
+            "max": format_value(self.max_value, self.type),
+            "top_values": ", ".join(f"{value} ({count})" for value, count in self.top_values.top(5)),
+        }
+
+    def to_json(self) -> Dict:
+        return {
+            "name": self.name, "type": self.type, "rows": self.rows, "nulls": self.nulls,
+            "min_value": self.min_value, "max_value": self.max_value,
+            "distinct": self.distinct.to_json(), "quantiles": self.quantiles.to_json(),
+            "top_values": self.top_values.to_json(),
+        }
+
+    @classmethod
+    def from_json(cls, data: Mapping) -> "ColumnProfile":
+        return cls(data["name"], data["type"], data["rows"], data["nulls"], data["min_value"], data["max_value"],
+                   HyperLogLog.from_json(data["distinct"]), KLLSketch.from_json(data["quantiles"]),
+                   TopK.from_json(data["top_values"]))
+
+
+@dataclass
+class TableProfile:
+    """Column profiles for one entity plus the partitions already folded in"""
+
+    entity: str
+    columns: Dict[str, ColumnProfile] = field(default_factory=dict)
+    partitions: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def for_entity(cls, entity: Entity) -> "TableProfile":
+        return cls(entity.name, {a.name: ColumnProfile(a.name, a.type) for a in entity.attributes})
+
+    @property
+    def rows(self) -> int:
+        return max((column.rows for column in self.columns.values()), default=0)
+
+    def add_rows(self, rows: Iterable[Mapping[str, Optional[str]]]) -> None:
+        for row in rows:
+            for name, column in self.columns.items():
+                column.add(row.get(name))
+
+    def merge(self, other: "TableProfile") -> "TableProfile":
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                self.columns[name] = column
+        self.partitions.update(other.partitions)
+        return self
+
+    def summary(self) -> List[Dict]:
+        return [column.summary() for column in self.columns.values()]
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"entity": self.entity, "partitions": self.partitions,
+                   "columns": [column.to_json() for column in self.columns.values()]}
+        # Write then rename so a concurrent reader never sees a partial profile
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["TableProfile"]:
+        if not path.exists():
+            return None
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        columns = {c["name"]: ColumnProfile.from_json(c) for c in payload["columns"]}
+        return cls(payload["entity"], columns, payload.get("partitions", {}))
+
+
+def partition_files(data_dir: str, entity_name: str) -> Dict[str, Path]:
+    """Map partition ids to files; the id changes whenever a file's size or mtime does"""
+    base = Path(data_dir)
+    directory = base / entity_name
+    if directory.is_dir():
+        paths = sorted(p for p in directory.iterdir() if p.name.endswith((".csv", ".csv.gz")))
+    else:
+        paths = [p for p in (base / f"{entity_name}.csv", base / f"{entity_name}.csv.gz") if p.exists()]
+    partitions = {}
+    for path in paths:
+        stat = path.stat()
+        partitions[f"{path.name}@{stat.st_size}:{stat.st_mtime_ns}"] = path
+    return partitions
+
+
+def read_rows(path: Path) -> Iterator[Dict[str, str]]:
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def refresh_profile(entity: Entity, data_dir: str, profile_path: Path) -> Optional[TableProfile]:
+    """Bring a stored profile up to date with the entity's data, profiling only new partitions"""
+    files = partition_files(data_dir, entity.name)
+    if not files:
+        return TableProfile.load(profile_path)
+
+    profile = TableProfile.load(profile_path)
+    if profile is None or not set(profile.partitions).issubset(files):
+        profile = TableProfile.for_entity(entity)
+    new_partitions = [pid for pid in files if pid not in profile.partitions]
+    for partition_id in new_partitions:
+        partial = TableProfile.for_entity(entity)
+        partial.add_rows(read_rows(files[partition_id]))
+        partial.partitions[partition_id] = files[partition_id].name
+        profile.merge(partial)
+    if new_partitions:
+        profile.save(profile_path)
+        logger.info(f"Profiled {len(new_partitions)} new partition(s) of {entity.name}")
+    return profile
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("layer", choices=sorted(LAYER_FILES))
+    parser.add_argument("data_dir", help="Directory with <ENTITY>.csv files or <ENTITY>/ partition directories")
+    parser.add_argument("--profile-dir", default=".profiles", help="Where sketches are persisted")
+    parser.add_argument("--entity", action="append", help="Entity to profile (default all in the layer)")
+    args = parser.parse_args(argv)
+
+    schema = load_layer(args.layer)
+    for name in args.entity or list(schema.entities):
+        profile = refresh_profile(schema.entity(name), args.data_dir, Path(args.profile_dir) / f"{name}.json")
+        if profile is None:
+            logger.warning(f"No data found for {name}")
+            continue
+        print(f"\n{name} ({profile.rows} rows)")
+        for summary in profile.summary():
+            print(f"  {summary['column']:<28} nulls={summary['null_rate']:<7} distinct~{summary['distinct_approx']:<8} "
+                  f"median={summary['median']}  top={summary['top_values'][:60]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
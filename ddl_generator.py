@@ -0,0 +1,239 @@
+"""Generate and deploy CREATE TABLE DDL for a whole layer from its ER diagram.
+
+Every entity of the layer becomes one ``CREATE TABLE`` statement with mapped
+column types, ``PRIMARY KEY`` / ``UNIQUE`` constraints and a comment on each
+foreign key naming the table and column it references. Fact tables get a
+clustering key built from their ``*_date_key`` and ``customer_key`` columns, as
+recommended in the architecture documentation.
+
+The statements for a layer are emitted as a single script and deployed in
+one call: on Snowflake the script is wrapped in an ``EXECUTE IMMEDIATE``
+block so the whole layer is provisioned in one round trip, and locally it
+runs in one ``executescript`` (SQLite) or ``execute`` (DuckDB) call. Local
+dialects have no clustering keys, so they get an index on the same columns.
+
+Usage:
+    python ddl_generator.py gold                                # print Snowflake DDL
+    python ddl_generator.py gold --deploy sqlite:/tmp/gold.db   # provision a local stand-in
+    python ddl_generator.py gold --schema GOLD --deploy snowflake:my_connection
+
+Deploying to Snowflake requires ``snowflake-connector-python``; DuckDB
+targets require ``duckdb``.
+"""
+
+import argparse
+import logging
+import sqlite3
+import sys
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from mermaid_schema import LAYER_FILES, Attribute, Entity, LayerSchema, load_layer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DIALECTS = ("snowflake", "duckdb", "sqlite")
+
+TYPE_MAP = {
+    "snowflake": {
+        "string": "VARCHAR",
+        "decimal": "NUMBER",
+        "int": "NUMBER(38,0)",
+        "datetime": "TIMESTAMP_TZ",
+        "date": "DATE",
+        "boolean": "BOOLEAN",
+    },
+    "duckdb": {
+        "string": "VARCHAR",
+        "decimal": "DECIMAL",
+        "int": "BIGINT",
+        "datetime": "TIMESTAMPTZ",
+        "date": "DATE",
+        "boolean": "BOOLEAN",
+    },
+    "sqlite": {
+        "string": "TEXT",
+        "decimal": "NUMERIC",
+        "int": "INTEGER",
+        "datetime": "TEXT",
+        "date": "TEXT",
+        "boolean": "INTEGER",
+    },
+}
+
+# (precision, scale) of decimal columns; matches arrow_schema.DECIMAL_OVERRIDES
+DEFAULT_DECIMAL = (18, 2)
+DECIMAL_PRECISION = {
+    "sentiment_score": (6, 4),
+    "avg_sentiment_score": (6, 4),
+    "sentiment_confidence": (6, 4),
+    "confidence_score": (6, 4),
+    "positive_score": (6, 4),
+    "negative_score": (6, 4),
+    "neutral_score": (6, 4),
+    "min_score": (6, 4),
+    "max_score": (6, 4),
+    "latitude": (9, 6),
+    "longitude": (9, 6),
+}
+
+
+def column_type(attribute: Attribute, dialect: str) -> str:
+    try:
+        sql_type = TYPE_MAP[dialect][attribute.type]
+    except KeyError:
+        raise ValueError(f"No {dialect} type for diagram type '{attribute.type}' ({attribute.name})") from None
+    if attribute.type == "decimal" and dialect != "sqlite":
+        precision, scale = DECIMAL_PRECISION.get(attribute.name, DEFAULT_DECIMAL)
+        sql_type = f"{sql_type}({precision},{scale})"
+    return sql_type
+
+
+def clustering_key(entity: Entity) -> List[str]:
+    """Date keys first, then ``customer_key``; a table's own primary key is never used"""
+    primary_key = set(entity.primary_key)
+    date_keys = [name for name in entity.column_names
+                 if (name == "date_key" or name.endswith("_date_key")) and name not in primary_key]
+    customer_keys = [name for name in entity.column_names if name == "customer_key" and name not in primary_key]
+    return date_keys + customer_keys
+
+
+def _quote(text: str) -> str:
+    return text.replace("'", "''")
+
+
+def qualified_name(entity: Entity, schema_name: Optional[str]) -> str:
+    return f"{schema_name}.{entity.name}" if schema_name else entity.name
+
+
+def create_table_sql(entity: Entity, schema: LayerSchema, dialect: str = "snowflake",
+                     schema_name: Optional[str] = None, replace: bool = False) -> str:
+    """DDL for one entity, including its clustering key (or the local index standing in for it)"""
+    if dialect not in DIALECTS:
+        raise ValueError(f"Unknown dialect '{dialect}', expected one of {list(DIALECTS)}")
+    if dialect == "sqlite":
+        schema_name = None  # SQLite schemas are attached databases, so tables stay unqualified
+    references = {r.column: f"{r.parent}.{r.parent_column}" for r in schema.relationships if r.child == entity.name}
+    table = qualified_name(entity, schema_name)
+
+    lines: List[Tuple[str, Optional[str]]] = []
+    for attribute in entity.attributes:
+        definition = f"{attribute.name} {column_type(attribute, dialect)}"
+        if attribute.is_primary_key:
+            definition += " NOT NULL"
+        comment = f"FK -> {references[attribute.name]}" if attribute.name in references else None
+        if comment and dialect == "snowflake":
+            definition += f" COMMENT '{_quote(comment)}'"
+            comment = None
+        lines.append((definition, comment))
+    if entity.primary_key:
+        lines.append((f"PRIMARY KEY ({', '.join(entity.primary_key)})", None))
+    for column in entity.unique_keys:
+        lines.append((f"UNIQUE ({column})", None))
+
+    body = []
+    for index, (definition, comment) in enumerate(lines):
+        separator = "," if index < len(lines) - 1 else ""
+        body.append(f"    {definition}{separator}" + (f"  -- {comment}" if comment else ""))
+
+    if replace and dialect == "snowflake":
+        head = f"CREATE OR REPLACE TABLE {table}"
+    elif replace:
+        head = f"DROP TABLE IF EXISTS {table};\nCREATE TABLE {table}"
+    else:
+        head = f"CREATE TABLE IF NOT EXISTS {table}"
+    statement = head + " (\n" + "\n".join(body) + "\n)"
+
+    cluster = clustering_key(entity)
+    if cluster and dialect == "snowflake":
+        statement += f"\nCLUSTER BY ({', '.join(cluster)})"
+    statement += ";"
+    if cluster and dialect != "snowflake":
+        statement += (f"\nCREATE INDEX IF NOT EXISTS {entity.name.lower()}_cluster_idx "
+                      f"ON {table} ({', '.join(cluster)});")
+    return statement
+
+
+def layer_ddl(layer: str, dialect: str = "snowflake", schema_name: Optional[str] = None,
+              replace: bool = False, base_dir: Optional[str] = None) -> str:
+    """The whole layer as one script, tables in diagram order"""
+    schema = load_layer(layer, base_dir)
+    header = f"-- {layer.capitalize()} layer DDL generated from {LAYER_FILES[layer]} ({dialect})"
+    statements = [f"CREATE SCHEMA IF NOT EXISTS {schema_name};"] if schema_name and dialect != "sqlite" else []
+    statements += [create_table_sql(entity, schema, dialect, schema_name, replace)
+                   for entity in schema.entities.values()]
+    return header + "\n\n" + "\n\n".join(statements) + "\n"
+
+
+def snowflake_script_block(script: str) -> str:
+    """Wrap a multi-statement script in one Snowflake Scripting block so it runs in a single request"""
+    statements = "\n".join(line for line in script.splitlines() if not line.lstrip().startswith("--"))
+    return f"EXECUTE IMMEDIATE $$\nBEGIN\n{statements}\nEND;\n$$"
+
+
+def deploy(script: str, target: str) -> None:
+    """Run a generated script against ``sqlite:<path>``, ``duckdb:<path>`` or ``snowflake:<connection name>``"""
+    kind, _, location = target.partition(":")
+    if kind == "sqlite":
+        conn = sqlite3.connect(location or ":memory:")
+        try:
+            conn.executescript(f"BEGIN;\n{script}\nCOMMIT;")
+        finally:
+            conn.close()
+    elif kind == "duckdb":
+        import duckdb
+
+        conn = duckdb.connect(location or ":memory:")
+        try:
+            conn.execute(f"BEGIN TRANSACTION;\n{script}\nCOMMIT;")
+        finally:
+            conn.close()
+    elif kind == "snowflake":
+        import snowflake.connector
+
+        conn = (snowflake.connector.connect(connection_name=location) if location
+                else snowflake.connector.connect())
+        try:
+            conn.cursor().execute(snowflake_script_block(script))
+        finally:
+            conn.close()
+    else:
+        raise ValueError(f"Unknown deploy target '{target}', expected sqlite:<path>, duckdb:<path> "
+                         "or snowflake:<connection name>")
+    logger.info(f"Deployed DDL to {target}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("layers", nargs="*", metavar="LAYER",
+                        help=f"Layers to generate: {', '.join(LAYER_FILES)} (default all)")
+    parser.add_argument("--dialect", choices=DIALECTS, help="SQL dialect (default from the deploy target, else snowflake)")
+    parser.add_argument("--schema", help="Schema to create the tables in")
+    parser.add_argument("--replace", action="store_true", help="Replace existing tables")
+    parser.add_argument("--output", help="Write the script to this file")
+    parser.add_argument("--deploy", metavar="TARGET",
+                        help="Run the script: sqlite:<path>, duckdb:<path> or snowflake:<connection name>")
+    args = parser.parse_args(argv)
+    unknown = [layer for layer in args.layers if layer not in LAYER_FILES]
+    if unknown:
+        parser.error(f"unknown layer(s) {', '.join(unknown)}, expected {', '.join(LAYER_FILES)}")
+
+    dialect = args.dialect
+    if dialect is None:
+        target_kind = args.deploy.partition(":")[0] if args.deploy else ""
+        dialect = target_kind if target_kind in DIALECTS else "snowflake"
+
+    script = "\n".join(layer_ddl(layer, dialect, args.schema, args.replace) for layer in args.layers or LAYER_FILES)
+    if args.output:
+        Path(args.output).write_text(script, encoding="utf-8")
+        logger.info(f"Wrote {dialect} DDL to {args.output}")
+    elif not args.deploy:
+        print(script)
+    if args.deploy:
+        deploy(script, args.deploy)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
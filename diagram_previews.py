@@ -0,0 +1,122 @@
+"""Raster previews of the ER diagram SVGs, cached by SVG content hash.
+
+Parsing and laying out a 300-600 KB vector diagram is what makes layer
+switching feel slow in the browser. This module renders each SVG once to a
+couple of compressed WebP sizes (a sidebar thumbnail and a fit-to-width
+preview) and stores them as ``<cache_dir>/<sha256 prefix>_<variant>.webp``.
+Lookups only need the cache, so previews rendered ahead of time can be
+deployed next to the app:
+
+    python diagram_previews.py            # render previews for all layer SVGs
+    PUT file://.preview_cache/* @YOUR_APP_STAGE/.preview_cache/;
+
+Mermaid draws labels as HTML inside ``foreignObject``, which pure SVG
+rasterisers drop, so rendering uses headless Chromium via ``playwright``.
+Rendering needs ``playwright`` and ``Pillow``; reading cached previews needs
+neither.
+"""
+
+import argparse
+import hashlib
+import io
+import logging
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = ".preview_cache"
+PREVIEW_VARIANTS = {
+    "thumbnail": 320,
+    "fit": 1600,
+}
+WEBP_QUALITY = 80
+LAYER_SVGS = ["bronze_layer_er_diagram.svg", "silver_layer_er_diagram.svg", "gold_layer_er_diagram.svg"]
+
+
+def svg_digest(svg_content: str) -> str:
+    return hashlib.sha256(svg_content.encode("utf-8")).hexdigest()[:16]
+
+
+def preview_path(digest: str, variant: str, cache_dir: str = CACHE_DIR) -> Path:
+    if variant not in PREVIEW_VARIANTS:
+        raise ValueError(f"Unknown preview variant '{variant}', expected one of {sorted(PREVIEW_VARIANTS)}")
+    return Path(cache_dir) / f"{digest}_{variant}.webp"
+
+
+def cached_preview(svg_content: str, variant: str, cache_dir: str = CACHE_DIR) -> Optional[bytes]:
+    """Return a previously rendered preview for this exact SVG content, if there is one"""
+    path = preview_path(svg_digest(svg_content), variant, cache_dir)
+    try:
+        return path.read_bytes()
+    except OSError:
+        return None
+
+
+def render_png(svg_content: str, width: int) -> bytes:
+    """Rasterise an SVG at the given pixel width with headless Chromium"""
+    from playwright.sync_api import sync_playwright
+
+    # Let the diagram scale to the viewport instead of its inline max-width
+    svg_scaled = re.sub(r"max-width:\s*[\d.]+px;?", "", svg_content, count=1)
+    html = f'<html><body style="margin:0;background:white;width:{width}px">{svg_scaled}</body></html>'
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch()
+        try:
+            page = browser.new_page(viewport={"width": width, "height": 1000})
+            page.set_content(html, wait_until="load")
+            return page.locator("svg").first.screenshot(type="png")
+        finally:
+            browser.close()
+
+
+def build_previews(svg_content: str, cache_dir: str = CACHE_DIR) -> Dict[str, Path]:
+    """Render the largest variant once, downscale it for the others and write them to the cache"""
+    from PIL import Image
+
+    digest = svg_digest(svg_content)
+    paths = {variant: preview_path(digest, variant, cache_dir) for variant in PREVIEW_VARIANTS}
+    if all(path.exists() for path in paths.values()):
+        return paths
+
+    source = Image.open(io.BytesIO(render_png(svg_content, max(PREVIEW_VARIANTS.values())))).convert("RGB")
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    for variant, width in PREVIEW_VARIANTS.items():
+        height = max(1, round(source.height * width / source.width))
+        image = source if source.width == width else source.resize((width, height), Image.LANCZOS)
+        image.save(paths[variant], format="WEBP", quality=WEBP_QUALITY, method=6)
+    logger.info(f"Rendered previews {', '.join(p.name for p in paths.values())}")
+    return paths
+
+
+def get_preview(svg_content: str, variant: str, cache_dir: str = CACHE_DIR, render: bool = True) -> Optional[bytes]:
+    """Cached preview bytes, rendering on a miss when the rendering dependencies are installed"""
+    preview = cached_preview(svg_content, variant, cache_dir)
+    if preview is not None or not render:
+        return preview
+    try:
+        return build_previews(svg_content, cache_dir)[variant].read_bytes()
+    except ImportError as e:
+        logger.warning(f"Cannot render diagram previews ({e}); falling back to the vector view")
+    except Exception as e:
+        logger.error(f"Error rendering diagram preview: {str(e)}")
+    return None
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pre-render raster previews of the layer diagrams")
+    parser.add_argument("svg_files", nargs="*", default=LAYER_SVGS, help="SVG files (default all layer diagrams)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    for svg_file in args.svg_files:
+        content = Path(svg_file).read_text(encoding="utf-8")
+        build_previews(content, args.cache_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
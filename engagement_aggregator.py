@@ -0,0 +1,333 @@
+"""Incrementally maintain FACT_CUSTOMER_ENGAGEMENT from FACT_SALES and FACT_SOCIAL_SENTIMENT deltas.
+
+Instead of rescanning the fact history, the aggregator keeps a mergeable
+partial state per ``customer_key`` (purchase counts by offering type, revenue
+and order sums, mention and sentiment sums, last purchase date). New fact rows
+are folded into that state, so fact rows are read only once. Averages,
+recency and engagement tiers are derived from the merged state at refresh
+time: every customer on the first refresh of a new snapshot date (recency and
+tier depend on the date), and only the customers touched by new facts on
+further refreshes of the same date.
+
+Usage:
+    python engagement_aggregator.py gold.db --state engagement_state.json
+"""
+
+import argparse
+import datetime as dt
+import json
+import logging
+import sqlite3
+import sys
+from dataclasses import asdict, dataclass, field
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+OFFERING_COLUMNS = {
+    "product_key": "product_purchases",
+    "service_key": "service_purchases",
+    "certification_key": "certification_purchases",
+    "training_key": "training_purchases",
+}
+
+# Engagement tier thresholds, evaluated top to bottom
+DORMANT_AFTER_DAYS = 365
+AT_RISK_AFTER_DAYS = 180
+CHAMPION_MAX_DAYS = 90
+CHAMPION_MIN_ORDERS = 10
+CHAMPION_MIN_REVENUE = Decimal("2000")
+LOYAL_MIN_ORDERS = 5
+
+# Columns ordering each fact table for its watermark, first non-NULL wins:
+# rows loaded without a created_date are ordered by the event time instead
+WATERMARK_COLUMNS = {
+    "FACT_SALES": ("created_date", "transaction_timestamp"),
+    "FACT_SOCIAL_SENTIMENT": ("created_date", "post_timestamp"),
+}
+
+
+def parse_date_key(value) -> dt.date:
+    """Convert a YYYYMMDD ``*_date_key`` into a date"""
+    value = int(value)
+    return dt.date(value // 10_000, value // 100 % 100, value % 100)
+
+
+def to_date_key(day: dt.date) -> int:
+    return day.year * 10_000 + day.month * 100 + day.day
+
+
+def watermark_order(table: str, row: Mapping) -> Optional[str]:
+    """The value a fact row is ordered by, i.e. ``COALESCE`` over ``WATERMARK_COLUMNS``"""
+    return next((row[column] for column in WATERMARK_COLUMNS[table] if row.get(column) is not None), None)
+
+
+@dataclass
+class CustomerState:
+    """Mergeable partial aggregates for one customer"""
+
+    product_purchases: int = 0
+    service_purchases: int = 0
+    certification_purchases: int = 0
+    training_purchases: int = 0
+    order_count: int = 0
+    revenue: Decimal = Decimal("0")
+    social_mentions: int = 0
+    sentiment_sum: Decimal = Decimal("0")
+    sentiment_count: int = 0
+    last_purchase_date: Optional[dt.date] = None
+
+    def merge(self, other: "CustomerState") -> "CustomerState":
+        """Fold another partial state into this one (sums add, last purchase takes the max)"""
+        self.product_purchases += other.product_purchases
+        self.service_purchases += other.service_purchases
+        self.certification_purchases += other.certification_purchases
+        self.training_purchases += other.training_purchases
+        self.order_count += other.order_count
+        self.revenue += other.revenue
+        self.social_mentions += other.social_mentions
+        self.sentiment_sum += other.sentiment_sum
+        self.sentiment_count += other.sentiment_count
+        if other.last_purchase_date and (
+            self.last_purchase_date is None or other.last_purchase_date > self.last_purchase_date
+        ):
+            self.last_purchase_date = other.last_purchase_date
+        return self
+
+    def to_json(self) -> Dict:
+        data = asdict(self)
+        data["revenue"] = str(self.revenue)
+        data["sentiment_sum"] = str(self.sentiment_sum)
+        data["last_purchase_date"] = self.last_purchase_date.isoformat() if self.last_purchase_date else None
+        return data
+
+    @classmethod
+    def from_json(cls, data: Mapping) -> "CustomerState":
+        data = dict(data)
+        data["revenue"] = Decimal(data["revenue"])
+        data["sentiment_sum"] = Decimal(data["sentiment_sum"])
+        if data.get("last_purchase_date"):
+            data["last_purchase_date"] = dt.date.fromisoformat(data["last_purchase_date"])
+        return cls(**data)
+
+
+def engagement_tier(state: CustomerState, days_since_last_purchase: Optional[int]) -> str:
+    """Classify a customer from their merged state"""
+    if days_since_last_purchase is None or days_since_last_purchase > DORMANT_AFTER_DAYS:
+        return "Dormant"
+    if days_since_last_purchase > AT_RISK_AFTER_DAYS:
+        return "At Risk"
+    sentiment_ok = state.sentiment_count == 0 or state.sentiment_sum >= 0
+    if (days_since_last_purchase <= CHAMPION_MAX_DAYS and state.order_count >= CHAMPION_MIN_ORDERS
+            and state.revenue >= CHAMPION_MIN_REVENUE and sentiment_ok):
+        return "Champion"
+    if state.order_count >= LOYAL_MIN_ORDERS:
+        return "Loyal"
+    return "Active"
+
+
+@dataclass
+class Watermark:
+    """Highest order value applied from a fact table, plus the keys that make re-reads safe
+
+    The order value is the first non-NULL column of ``WATERMARK_COLUMNS``.
+    Reads are inclusive of ``value``, so rows that arrive later with the same
+    order value are still picked up; ``boundary_keys`` holds the fact keys
+    already applied at exactly that value. Rows must be offered in order.
+    """
+
+    value: Optional[str] = None
+    boundary_keys: Set[str] = field(default_factory=set)
+
+    def admit(self, fact_key, order_value: Optional[str]) -> bool:
+        """Record a fact row, returning False if it was already applied or cannot be ordered"""
+        fact_key = str(fact_key)
+        if order_value is None or (self.value is not None and order_value < self.value):
+            return False
+        if order_value == self.value:
+            if fact_key in self.boundary_keys:
+                return False
+            self.boundary_keys.add(fact_key)
+            return True
+        self.value = order_value
+        self.boundary_keys = {fact_key}
+        return True
+
+    def to_json(self) -> Dict:
+        return {"value": self.value, "boundary_keys": sorted(self.boundary_keys)}
+
+    @classmethod
+    def from_json(cls, data) -> "Watermark":
+        if data is None:
+            return cls()
+        return cls(data.get("value"), set(data.get("boundary_keys", ())))
+
+
+@dataclass
+class EngagementAggregator:
+    """Per-customer engagement state plus the watermarks of the fact rows already applied"""
+
+    states: Dict[int, CustomerState] = field(default_factory=dict)
+    sales_watermark: Watermark = field(default_factory=Watermark)
+    sentiment_watermark: Watermark = field(default_factory=Watermark)
+    snapshot_date: Optional[dt.date] = None
+    dirty: Set[int] = field(default_factory=set)
+
+    def _state(self, customer_key: int) -> CustomerState:
+        state = self.states.get(customer_key)
+        if state is None:
+            state = self.states[customer_key] = CustomerState()
+        return state
+
+    def apply_sales(self, rows: Iterable[Mapping]) -> int:
+        """Fold new FACT_SALES rows into the customer states; returns the number applied"""
+        applied = 0
+        for row in rows:
+            if not self.sales_watermark.admit(row["sales_fact_key"], watermark_order("FACT_SALES", row)):
+                continue
+            customer_key = row["customer_key"]
+            if customer_key is None:
+                continue
+            delta = CustomerState()
+            refunded = bool(row.get("is_refunded"))
+            delta.revenue = Decimal(str(row.get("net_amount") or 0)) - Decimal(str(row.get("refund_amount") or 0))
+            if not refunded:
+                delta.order_count = 1
+                for key_column, counter in OFFERING_COLUMNS.items():
+                    if row.get(key_column) is not None:
+                        setattr(delta, counter, getattr(delta, counter) + 1)
+                delta.last_purchase_date = parse_date_key(row["transaction_date_key"])
+            self._state(customer_key).merge(delta)
+            self.dirty.add(customer_key)
+            applied += 1
+        return applied
+
+    def apply_sentiment(self, rows: Iterable[Mapping]) -> int:
+        """Fold new FACT_SOCIAL_SENTIMENT rows into the customer states; returns the number applied"""
+        applied = 0
+        for row in rows:
+            order_value = watermark_order("FACT_SOCIAL_SENTIMENT", row)
+            if not self.sentiment_watermark.admit(row["sentiment_fact_key"], order_value):
+                continue
+            customer_key = row.get("customer_key")
+            if customer_key is None:
+                continue
+            delta = CustomerState(social_mentions=1)
+            if row.get("sentiment_score") is not None:
+                delta.sentiment_sum = Decimal(str(row["sentiment_score"]))
+                delta.sentiment_count = 1
+            self._state(customer_key).merge(delta)
+            self.dirty.add(customer_key)
+            applied += 1
+        return applied
+
+    def derive(self, customer_key: int, as_of: dt.date) -> Dict:
+        """Build a FACT_CUSTOMER_ENGAGEMENT row for one customer as of a date"""
+        state = self.states[customer_key]
+        days = (as_of - state.last_purchase_date).days if state.last_purchase_date else None
+        date_key = to_date_key(as_of)
+        average_order_value = (state.revenue / state.order_count) if state.order_count else Decimal("0")
+        avg_sentiment = (state.sentiment_sum / state.sentiment_count) if state.sentiment_count else None
+        return {
+            "engagement_fact_key": f"{customer_key}-{date_key}",
+            "customer_key": customer_key,
+            "date_key": date_key,
+            "product_purchases": state.product_purchases,
+            "service_purchases": state.service_purchases,
+            "certification_purchases": state.certification_purchases,
+            "training_purchases": state.training_purchases,
+            "total_revenue": state.revenue.quantize(Decimal("0.01")),
+            "average_order_value": average_order_value.quantize(Decimal("0.01")),
+            "social_mentions": state.social_mentions,
+            "avg_sentiment_score": avg_sentiment.quantize(Decimal("0.001")) if avg_sentiment is not None else None,
+            "days_since_last_purchase": days,
+            "engagement_tier": engagement_tier(state, days),
+            "created_date": dt.datetime.now().isoformat(sep=" ", timespec="seconds"),
+        }
+
+    def refresh(self, as_of: dt.date) -> List[Dict]:
+        """Derive the snapshot rows that changed since the last refresh and clear the dirty set.
+
+        Days since last purchase moves for every customer when the date
+        changes, and the tier with it, so a new ``as_of`` derives a full
+        snapshot. Refreshing the same date again only re-derives customers
+        touched by new facts.
+        """
+        customer_keys = self.states.keys() if as_of != self.snapshot_date else self.dirty
+        rows = [self.derive(customer_key, as_of) for customer_key in sorted(customer_keys)]
+        self.snapshot_date = as_of
+        self.dirty.clear()
+        return rows
+
+    def save(self, path: str) -> None:
+        payload = {
+            "sales_watermark": self.sales_watermark.to_json(),
+            "sentiment_watermark": self.sentiment_watermark.to_json(),
+            "snapshot_date": self.snapshot_date.isoformat() if self.snapshot_date else None,
+            "states": {str(key): state.to_json() for key, state in self.states.items()},
+        }
+        Path(path).write_text(json.dumps(payload), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: str) -> "EngagementAggregator":
+        state_path = Path(path)
+        if not state_path.exists():
+            return cls()
+        payload = json.loads(state_path.read_text(encoding="utf-8"))
+        return cls(
+            states={int(key): CustomerState.from_json(value) for key, value in payload["states"].items()},
+            sales_watermark=Watermark.from_json(payload.get("sales_watermark")),
+            sentiment_watermark=Watermark.from_json(payload.get("sentiment_watermark")),
+            snapshot_date=dt.date.fromisoformat(payload["snapshot_date"]) if payload.get("snapshot_date") else None,
+        )
+
+
+def _rows_after(conn: sqlite3.Connection, table: str, watermark: Watermark) -> Iterable[Dict]:
+    """Rows at or after the watermark in order; already applied ones are skipped by ``admit``"""
+    order = f"COALESCE({', '.join(WATERMARK_COLUMNS[table])})"
+    cursor = conn.execute(
+        f"SELECT * FROM {table} WHERE ? IS NULL OR {order} >= ? ORDER BY {order}",
+        (watermark.value, watermark.value),
+    )
+    columns = [description[0] for description in cursor.description]
+    for values in cursor:
+        yield dict(zip(columns, values))
+
+
+def refresh_sqlite(conn: sqlite3.Connection, aggregator: EngagementAggregator, as_of: dt.date) -> int:
+    """Apply fact rows newer than the watermarks and upsert the affected engagement rows"""
+    sales = aggregator.apply_sales(_rows_after(conn, "FACT_SALES", aggregator.sales_watermark))
+    sentiment = aggregator.apply_sentiment(_rows_after(conn, "FACT_SOCIAL_SENTIMENT", aggregator.sentiment_watermark))
+    rows = aggregator.refresh(as_of)
+    if rows:
+        columns = list(rows[0])
+        conn.executemany(
+            f"INSERT OR REPLACE INTO FACT_CUSTOMER_ENGAGEMENT ({', '.join(columns)}) "
+            f"VALUES ({', '.join(':' + c for c in columns)})",
+            ({k: (float(v) if isinstance(v, Decimal) else v) for k, v in row.items()} for row in rows),
+        )
+        conn.commit()
+    logger.info(f"Applied {sales} sales and {sentiment} sentiment deltas, refreshed {len(rows)} customers")
+    return len(rows)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("database", help="SQLite database containing the Gold fact tables")
+    parser.add_argument("--state", default="engagement_state.json", help="Path of the persisted aggregator state")
+    parser.add_argument("--as-of", type=dt.date.fromisoformat, default=dt.date.today(),
+                        help="Snapshot date for recency and tiers (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    aggregator = EngagementAggregator.load(args.state)
+    with sqlite3.connect(args.database) as conn:
+        refresh_sqlite(conn, aggregator, args.as_of)
+    aggregator.save(args.state)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""Zip bundle of every architecture artifact, built on demand and cached by content hash.
+
+The bundle holds the Mermaid sources, the rendered SVGs, the documentation
+and any generated artifacts registered in ``GENERATED_ARTIFACTS``. Archives
+are written to ``<cache_dir>/medallion_architecture_<digest>.zip`` where the
+digest covers the name and content of every member. An unchanged set of
+artifacts is therefore served from the existing file, and files are copied
+into the archive in chunks so memory stays flat regardless of artifact size.
+
+Usage:
+    python export_bundle.py            # prints the path of the (cached) bundle
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ddl_generator import layer_ddl
+from mermaid_schema import LAYER_FILES
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = ".export_cache"
+BUNDLE_PREFIX = "medallion_architecture_"
+CHUNK_SIZE = 1024 * 1024
+
+ARTIFACT_FILES = [
+    "bronze_layer_er_diagram.mmd",
+    "silver_layer_er_diagram.mmd",
+    "gold_layer_er_diagram.mmd",
+    "bronze_layer_er_diagram.svg",
+    "silver_layer_er_diagram.svg",
+    "gold_layer_er_diagram.svg",
+    "Medallion_Architecture_Documentation.md",
+    "README.md",
+    "deployment_instructions_local.md",
+]
+
+# Archive name -> callable producing the artifact text. Generators are only
+# invoked when a bundle is built or its digest computed.
+GENERATED_ARTIFACTS: Dict[str, Callable[[], str]] = {
+    f"ddl/{layer}_layer.sql": partial(layer_ddl, layer) for layer in LAYER_FILES
+}
+
+
+def _base_dir() -> Path:
+    return Path(__file__).parent
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def collect_members(base_dir: Optional[Path] = None) -> Dict[str, Path]:
+    """Artifact files that exist on disk, keyed by their name inside the archive"""
+    base_dir = base_dir or _base_dir()
+    members = {}
+    for name in ARTIFACT_FILES:
+        path = base_dir / name
+        if path.is_file():
+            members[name] = path
+        else:
+            logger.warning(f"Export artifact not found: {name}")
+    return members
+
+
+def bundle_digest(members: Dict[str, Path], generated: Dict[str, str]) -> str:
+    digest = hashlib.sha256()
+    for name in sorted(members):
+        digest.update(f"{name}\0{_file_digest(members[name])}\0".encode("utf-8"))
+    for name in sorted(generated):
+        digest.update(f"{name}\0{hashlib.sha256(generated[name].encode('utf-8')).hexdigest()}\0".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def build_bundle(cache_dir: str = CACHE_DIR, base_dir: Optional[Path] = None) -> Path:
+    """Return the path of an up-to-date bundle, writing it only if no archive with the same digest exists"""
+    members = collect_members(base_dir)
+    generated = {name: produce() for name, produce in GENERATED_ARTIFACTS.items()}
+    digest = bundle_digest(members, generated)
+
+    cache = Path(cache_dir)
+    bundle_path = cache / f"{BUNDLE_PREFIX}{digest}.zip"
+    if bundle_path.exists():
+        return bundle_path
+
+    cache.mkdir(parents=True, exist_ok=True)
+    # App sessions are threads of one process, so every build needs its own temp file
+    with tempfile.NamedTemporaryFile(dir=cache, prefix=f".{bundle_path.name}.", suffix=".tmp",
+                                     delete=False) as tmp:
+        tmp_path = Path(tmp.name)
+        try:
+            with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as archive:
+                for name, path in members.items():
+                    with open(path, "rb") as source, archive.open(name, "w") as target:
+                        shutil.copyfileobj(source, target, CHUNK_SIZE)
+                for name, text in generated.items():
+                    archive.writestr(name, text)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    try:
+        os.replace(tmp_path, bundle_path)
+    except OSError:
+        # Lost the race to a concurrent build of the same digest (Windows will not replace an open file)
+        tmp_path.unlink(missing_ok=True)
+        if not bundle_path.exists():
+            raise
+        return bundle_path
+    logger.info(f"Built export bundle {bundle_path.name} with {len(members) + len(generated)} artifacts")
+
+    for stale in cache.glob(f"{BUNDLE_PREFIX}*.zip"):
+        if stale != bundle_path:
+            stale.unlink(missing_ok=True)
+    return bundle_path
+
+
+def read_bundle(cache_dir: str = CACHE_DIR, base_dir: Optional[Path] = None) -> bytes:
+    """Contents of an up-to-date bundle
+
+    A concurrent build of newer artifacts prunes older bundles, so if the
+    bundle disappears before it is read it is simply built again.
+    """
+    try:
+        return build_bundle(cache_dir, base_dir).read_bytes()
+    except FileNotFoundError:
+        return build_bundle(cache_dir, base_dir).read_bytes()
+
+
+def list_members(path: Path) -> List[str]:
+    with zipfile.ZipFile(path) as archive:
+        return archive.namelist()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    bundle_path = build_bundle(args.cache_dir)
+    print(bundle_path)
+    for name in list_members(bundle_path):
+        print(f"  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
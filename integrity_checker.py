@@ -0,0 +1,277 @@
+"""Referential integrity checker for the FK relationships declared in the layer diagrams.
+
+Relationships are read from the ``.mmd`` sources via ``mermaid_schema`` and
+grouped by child table. For each child, the parent key column of every one of
+its relationships is loaded into either a Bloom filter (bounded memory, may
+miss a small fraction of orphans) or a sorted, de-duplicated key array
+(exact). The child table is then streamed once, checking all of its FK
+columns in the same pass, and every key that is not found is counted as an
+orphan. Child tables are checked in parallel worker processes.
+
+Tables are read from ``<data_dir>/<TABLE_NAME>.csv`` (optionally ``.csv.gz``)
+with a header row; empty values are treated as NULL.
+
+Usage:
+    python integrity_checker.py gold ./exports/gold --method bloom --workers 4
+"""
+
+import argparse
+import bisect
+import csv
+import gzip
+import hashlib
+import json
+import logging
+import math
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from mermaid_schema import LAYER_FILES, Relationship, load_layer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_FALSE_POSITIVE_RATE = 0.001
+DEFAULT_SAMPLE_SIZE = 10
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over a single BLAKE2b digest"""
+
+    def __init__(self, capacity: int, false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.false_positive_rate = false_positive_rate
+
+    def _positions(self, key: str) -> Iterator[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+class SortedKeySet:
+    """Exact membership over a sorted, de-duplicated key array"""
+
+    false_positive_rate = 0.0
+
+    def __init__(self, keys: Iterator[str]):
+        self.keys = sorted(set(keys))
+
+    def __contains__(self, key: str) -> bool:
+        index = bisect.bisect_left(self.keys, key)
+        return index < len(self.keys) and self.keys[index] == key
+
+
+@dataclass
+class RelationshipResult:
+    """Outcome of checking one relationship"""
+
+    child: str
+    column: str
+    parent: str
+    parent_column: str
+    method: str
+    status: str = "ok"
+    child_rows: int = 0
+    parent_keys: int = 0
+    null_keys: int = 0
+    orphan_rows: int = 0
+    orphan_samples: List[str] = field(default_factory=list)
+    false_positive_rate: float = 0.0
+    message: str = ""
+
+
+def table_path(data_dir: str, table: str) -> Optional[Path]:
+    for suffix in (".csv", ".csv.gz"):
+        path = Path(data_dir) / f"{table}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def stream_columns(path: Path, columns: Sequence[str]) -> Iterator[Tuple[Optional[str], ...]]:
+    """Yield the given columns of each CSV record without holding the file in memory"""
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        indexes = []
+        for column in columns:
+            try:
+                indexes.append(header.index(column))
+            except ValueError:
+                raise ValueError(f"Column {column} not found in {path.name}") from None
+        for record in reader:
+            values = (record[index] if index < len(record) else "" for index in indexes)
+            yield tuple(value if value != "" else None for value in values)
+
+
+def stream_column(path: Path, column: str) -> Iterator[Optional[str]]:
+    """Yield one column of a CSV file without holding the file in memory"""
+    for (value,) in stream_columns(path, [column]):
+        yield value
+
+
+def count_rows(path: Path) -> int:
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        return max(0, sum(1 for _ in f) - 1)
+
+
+KeySet = Union[BloomFilter, SortedKeySet]
+
+
+def load_parent_keys(path: Path, column: str, method: str,
+                     false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE) -> Tuple[KeySet, int]:
+    """Load a parent key column into a Bloom filter or sorted key set; returns the set and its key count"""
+    if method == "bloom":
+        keys = BloomFilter(count_rows(path), false_positive_rate)
+        count = 0
+        for key in stream_column(path, column):
+            if key is not None:
+                keys.add(key)
+                count += 1
+        return keys, count
+    keys = SortedKeySet(k for k in stream_column(path, column) if k is not None)
+    return keys, len(keys.keys)
+
+
+def _finish(result: RelationshipResult, relationship: Relationship) -> RelationshipResult:
+    if result.orphan_rows:
+        result.status = "violations"
+    if result.null_keys and not relationship.optional:
+        result.status = "violations"
+        result.message = f"{result.null_keys} NULL keys in a mandatory relationship"
+    return result
+
+
+def check_child_table(child: str, relationships: Sequence[Relationship], data_dir: str, method: str = "bloom",
+                      false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE,
+                      sample_size: int = DEFAULT_SAMPLE_SIZE) -> List[RelationshipResult]:
+    """Check every relationship of one child table in a single pass over it; runs in a worker process"""
+    results = [RelationshipResult(r.child, r.column, r.parent, r.parent_column, method) for r in relationships]
+    child_path = table_path(data_dir, child)
+    if child_path is None:
+        for result in results:
+            result.status = "skipped"
+            result.message = f"Missing data for {child}"
+        return results
+
+    # Parent key sets, shared when several relationships reference the same parent column
+    parent_keys: Dict[Tuple[str, str], Tuple[KeySet, int]] = {}
+    active: List[Tuple[int, KeySet]] = []
+    for index, (relationship, result) in enumerate(zip(relationships, results)):
+        parent_path = table_path(data_dir, relationship.parent)
+        if parent_path is None:
+            result.status = "skipped"
+            result.message = f"Missing data for {relationship.parent}"
+            continue
+        parent = (relationship.parent, relationship.parent_column)
+        try:
+            if parent not in parent_keys:
+                parent_keys[parent] = load_parent_keys(parent_path, relationship.parent_column, method,
+                                                       false_positive_rate)
+        except (OSError, ValueError, csv.Error) as e:
+            result.status = "error"
+            result.message = str(e)
+            continue
+        keys, result.parent_keys = parent_keys[parent]
+        result.false_positive_rate = keys.false_positive_rate
+        active.append((index, keys))
+
+    if not active:
+        return results
+
+    checks = [(results[index], keys, set()) for index, keys in active]
+    try:
+        for values in stream_columns(child_path, [relationships[index].column for index, _ in active]):
+            for key, (result, keys, seen_samples) in zip(values, checks):
+                result.child_rows += 1
+                if key is None:
+                    result.null_keys += 1
+                elif key not in keys:
+                    result.orphan_rows += 1
+                    if len(seen_samples) < sample_size and key not in seen_samples:
+                        seen_samples.add(key)
+                        result.orphan_samples.append(key)
+    except (OSError, ValueError, csv.Error) as e:
+        for result, _, _ in checks:
+            result.status = "error"
+            result.message = str(e)
+        return results
+
+    for index, _ in active:
+        _finish(results[index], relationships[index])
+    return results
+
+
+def check_relationship(relationship: Relationship, data_dir: str, method: str = "bloom",
+                       false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE,
+                       sample_size: int = DEFAULT_SAMPLE_SIZE) -> RelationshipResult:
+    """Check a single relationship"""
+    return check_child_table(relationship.child, [relationship], data_dir, method,
+                             false_positive_rate, sample_size)[0]
+
+
+def check_layer(layer: str, data_dir: str, method: str = "bloom", workers: Optional[int] = None,
+                false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE,
+                sample_size: int = DEFAULT_SAMPLE_SIZE) -> List[RelationshipResult]:
+    """Check every relationship of a layer, one worker process per child table, results in diagram order"""
+    relationships = load_layer(layer).relationships
+    by_child: Dict[str, List[Relationship]] = {}
+    for relationship in relationships:
+        by_child.setdefault(relationship.child, []).append(relationship)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            child: pool.submit(check_child_table, child, group, data_dir, method, false_positive_rate, sample_size)
+            for child, group in by_child.items()
+        }
+        checked = {child: iter(future.result()) for child, future in futures.items()}
+    return [next(checked[relationship.child]) for relationship in relationships]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("layer", choices=sorted(LAYER_FILES))
+    parser.add_argument("data_dir", help="Directory containing <TABLE>.csv extracts")
+    parser.add_argument("--method", choices=["bloom", "sorted"], default="bloom",
+                        help="bloom: bounded memory, approximate; sorted: exact, holds parent keys")
+    parser.add_argument("--workers", type=int, help="Parallel worker processes (default CPU count)")
+    parser.add_argument("--fpr", type=float, default=DEFAULT_FALSE_POSITIVE_RATE, help="Bloom false positive rate")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLE_SIZE, help="Orphan keys to sample per relationship")
+    parser.add_argument("--report", help="Write the results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = check_layer(args.layer, args.data_dir, args.method, args.workers, args.fpr, args.samples)
+    for result in results:
+        line = (f"{result.child}.{result.column} -> {result.parent}.{result.parent_column}: {result.status} "
+                f"({result.orphan_rows} orphans, {result.null_keys} nulls in {result.child_rows} rows)")
+        if result.status == "ok":
+            logger.info(line)
+        elif result.status == "skipped":
+            logger.warning(f"{line} - {result.message}")
+        else:
+            logger.error(f"{line} {result.message} samples={result.orphan_samples}")
+
+    if args.report:
+        Path(args.report).write_text(json.dumps([asdict(r) for r in results], indent=2), encoding="utf-8")
+    return 1 if any(r.status in ("violations", "error") for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
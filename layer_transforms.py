@@ -0,0 +1,96 @@
+"""Bronze to Silver transforms that operate on Arrow record batches.
+
+Each transform takes a Bronze batch conformed to its registry schema and
+returns a batch conformed to the Silver target schema. All work is done with
+``pyarrow.compute`` kernels on whole columns; rows are never materialised as
+Python objects, and columns that need no change are handed through as-is.
+
+Requires ``pyarrow``.
+"""
+
+import logging
+from typing import Callable, Dict, Iterable, Iterator
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from arrow_schema import SchemaRegistry, conform
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BatchTransform = Callable[[pa.RecordBatch, SchemaRegistry], pa.RecordBatch]
+
+
+def _standardize_code(array: pa.Array) -> pa.Array:
+    """Trim and upper-case a code column, working on the dictionary values only when encoded"""
+    if pa.types.is_dictionary(array.type):
+        values = pc.utf8_upper(pc.utf8_trim_whitespace(array.dictionary))
+        return pa.DictionaryArray.from_arrays(array.indices, values)
+    return pc.utf8_upper(pc.utf8_trim_whitespace(array))
+
+
+def _clean_text(array: pa.Array) -> pa.Array:
+    return pc.utf8_trim_whitespace(array)
+
+
+def refine_sales_transactions(batch: pa.RecordBatch, registry: SchemaRegistry) -> pa.RecordBatch:
+    """RAW_SALES_TRANSACTIONS -> REFINED_SALES_FACTS"""
+    amount = batch.column("amount")
+    columns: Dict[str, pa.Array] = {
+        "sales_fact_id": batch.column("transaction_id"),
+        "transaction_id": batch.column("transaction_id"),
+        "customer_key": batch.column("customer_id"),
+        "product_key": batch.column("product_id"),
+        "service_key": batch.column("service_id"),
+        "certification_key": batch.column("certification_id"),
+        "training_key": batch.column("training_id"),
+        "gross_amount": amount,
+        "net_amount": amount,
+        "transaction_date": pc.cast(batch.column("transaction_date"), pa.date32()),
+        "payment_method_std": _standardize_code(batch.column("payment_method")),
+        "sales_channel_std": _standardize_code(batch.column("sales_channel")),
+        "sales_rep_key": batch.column("sales_rep_id"),
+        "is_refunded": pc.less(amount, pa.scalar(0, type=amount.type)),
+        "created_timestamp": batch.column("ingested_at"),
+        "modified_timestamp": batch.column("ingested_at"),
+    }
+    return conform(pa.RecordBatch.from_pydict(columns), registry.schema("REFINED_SALES_FACTS"))
+
+
+def refine_twitter_posts(batch: pa.RecordBatch, registry: SchemaRegistry) -> pa.RecordBatch:
+    """RAW_TWITTER_POSTS -> REFINED_SOCIAL_MEDIA_POSTS (sentiment columns are filled by the analysis step)"""
+    retweets, likes, replies = (pc.fill_null(batch.column(name), 0)
+                                for name in ("retweet_count", "like_count", "reply_count"))
+    columns: Dict[str, pa.Array] = {
+        "post_key": pc.binary_join_element_wise("twitter", batch.column("tweet_id"), ":"),
+        "platform_std": pc.dictionary_encode(pa.repeat("TWITTER", batch.num_rows)),
+        "original_post_id": batch.column("tweet_id"),
+        "user_id_clean": _clean_text(batch.column("user_id")),
+        "username_clean": pc.utf8_lower(_clean_text(batch.column("username"))),
+        "content_clean": _clean_text(batch.column("tweet_text")),
+        "engagement_score": pc.add(pc.add(retweets, likes), replies),
+        "post_timestamp": batch.column("created_at"),
+        "contains_nasm_keywords": pc.match_substring(batch.column("tweet_text"), "nasm", ignore_case=True),
+        "created_timestamp": batch.column("ingested_at"),
+        "modified_timestamp": batch.column("ingested_at"),
+    }
+    return conform(pa.RecordBatch.from_pydict(columns), registry.schema("REFINED_SOCIAL_MEDIA_POSTS"))
+
+
+TRANSFORMS: Dict[str, BatchTransform] = {
+    "RAW_SALES_TRANSACTIONS": refine_sales_transactions,
+    "RAW_TWITTER_POSTS": refine_twitter_posts,
+}
+
+
+def run_transform(source_table: str, batches: Iterable[pa.RecordBatch],
+                  registry: SchemaRegistry) -> Iterator[pa.RecordBatch]:
+    """Conform each Bronze batch to its registry schema and stream it through the table's transform"""
+    try:
+        transform = TRANSFORMS[source_table]
+    except KeyError:
+        raise ValueError(f"No Silver transform registered for {source_table}") from None
+    source_schema = registry.schema(source_table)
+    for batch in batches:
+        yield transform(conform(batch, source_schema), registry)
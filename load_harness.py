@@ -0,0 +1,380 @@
+"""Concurrent-session load test for the Streamlit viewer.
+
+Starts ``Medallion_architecture_app.py`` on a local port (or targets an
+already running server), then drives many simulated browser sessions over
+Streamlit's websocket protocol. Each session runs a realistic flow:
+
+    open app -> switch layer -> zoom in x3 -> download SVG
+
+For every interaction the harness records the rerun latency (request sent to
+final ``script_finished``) and the websocket bytes received. Server RSS is
+sampled from ``/proc`` throughout the run. A JSON report with latency
+percentiles per interaction is written to ``load_test_results/``.
+
+Usage:
+    python load_harness.py --sessions 50 --iterations 3
+    python load_harness.py --url http://localhost:8501 --server-pid 1234
+
+Requires ``streamlit`` and ``websockets``.
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import logging
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.Selectbox_pb2 import Selectbox
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+APP_FILE = "Medallion_architecture_app.py"
+RESULTS_DIR = "load_test_results"
+LAYER_SELECT_LABEL = "Select Architecture Layer:"
+ZOOM_IN_LABEL = "🔍+ Zoom In"
+DOWNLOAD_LABEL = "⬇️ Download"
+PREPARE_LABEL_PREFIX = "📦 Prepare "
+LAYERS = ["Bronze Layer (Raw Data)", "Silver Layer (Refined Data)", "Gold Layer (Modeled Data)"]
+RERUN_TIMEOUT_SECONDS = 60
+
+# script_finished status emitted when a run stops because st.rerun() was called
+FINISHED_EARLY_FOR_RERUN = 2
+
+# Newer Streamlit versions send selectbox values as strings, older ones as option indices
+SELECTBOX_SENDS_STRING = "raw_value" in Selectbox.DESCRIPTOR.fields_by_name
+
+
+@dataclass
+class Interaction:
+    """One timed step of a session flow"""
+
+    name: str
+    latency_ms: float
+    bytes_received: int
+    messages: int
+
+
+@dataclass
+class SessionResult:
+    session: int
+    interactions: List[Interaction] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+class SimulatedSession:
+    """A headless browser session speaking Streamlit's protobuf websocket protocol"""
+
+    def __init__(self, base_url: str, session_number: int):
+        self.base_url = base_url.rstrip("/")
+        self.ws_url = self.base_url.replace("http", "ws", 1) + "/_stcore/stream"
+        self.session_number = session_number
+        self.widgets: Dict[str, object] = {}  # label -> element proto of the latest run
+        self.widget_values: Dict[str, WidgetState] = {}
+        self.page_script_hash = ""
+        self.session_id = ""
+        self.connection = None
+
+    async def __aenter__(self) -> "SimulatedSession":
+        self.connection = await websockets.connect(self.ws_url, subprotocols=["streamlit"], max_size=None)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.connection.close()
+
+    def _record_widget(self, element) -> None:
+        kind = element.WhichOneof("type")
+        if kind in ("selectbox", "button", "download_button"):
+            widget = getattr(element, kind)
+            self.widgets[widget.label] = widget
+
+    async def rerun(self, name: str, trigger: Optional[WidgetState] = None) -> Interaction:
+        """Send a rerun with the current widget values and wait for the run to complete"""
+        message = BackMsg()
+        message.rerun_script.page_script_hash = self.page_script_hash
+        for state in self.widget_values.values():
+            message.rerun_script.widget_states.widgets.append(state)
+        if trigger is not None:
+            message.rerun_script.widget_states.widgets.append(trigger)
+
+        start = time.perf_counter()
+        await self.connection.send(message.SerializeToString())
+        self.widgets = {}
+        received = count = 0
+        while True:
+            payload = await asyncio.wait_for(self.connection.recv(), RERUN_TIMEOUT_SECONDS)
+            received += len(payload)
+            count += 1
+            forward = ForwardMsg()
+            forward.ParseFromString(payload)
+            kind = forward.WhichOneof("type")
+            if kind == "new_session":
+                self.page_script_hash = forward.new_session.page_script_hash
+                self.session_id = forward.new_session.initialize.session_id
+            elif kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                self._record_widget(forward.delta.new_element)
+            elif kind == "script_finished" and forward.script_finished != FINISHED_EARLY_FOR_RERUN:
+                break
+        return Interaction(name, (time.perf_counter() - start) * 1000, received, count)
+
+    def _widget(self, label: str):
+        try:
+            return self.widgets[label]
+        except KeyError:
+            raise RuntimeError(f"Widget '{label}' was not rendered") from None
+
+    async def select_layer(self, layer: str) -> Interaction:
+        widget = self._widget(LAYER_SELECT_LABEL)
+        state = WidgetState(id=widget.id)
+        if SELECTBOX_SENDS_STRING:
+            state.string_value = layer
+        else:
+            state.int_value = list(widget.options).index(layer)
+        self.widget_values[widget.id] = state
+        return await self.rerun("switch_layer")
+
+    async def click(self, label: str, name: str) -> Interaction:
+        widget = self._widget(label)
+        return await self.rerun(name, WidgetState(id=widget.id, trigger_value=True))
+
+    async def _deferred_file_url(self, file_id: str) -> str:
+        """Ask the server to generate a lazily built download and return the URL it was stored under"""
+        message = BackMsg()
+        request = message.backend_operation_request
+        request.request_id = f"download-{self.session_number}-{time.monotonic_ns()}"
+        request.session_id = self.session_id
+        request.deferred_file.file_id = file_id
+        await self.connection.send(message.SerializeToString())
+        while True:
+            payload = await asyncio.wait_for(self.connection.recv(), RERUN_TIMEOUT_SECONDS)
+            forward = ForwardMsg()
+            forward.ParseFromString(payload)
+            if forward.WhichOneof("type") != "backend_operation_response":
+                continue
+            response = forward.backend_operation_response
+            if response.request_id != request.request_id:
+                continue
+            if response.error_msg:
+                raise RuntimeError(f"Deferred download failed: {response.error_msg}")
+            return response.deferred_file.url
+
+    async def download(self) -> Interaction:
+        """Fetch the SVG download payload the way the browser does, generating or preparing it first"""
+        start = time.perf_counter()
+        received = messages = 0
+        if DOWNLOAD_LABEL not in self.widgets:
+            # Without deferred downloads the app shows a Prepare button, then the download for one run
+            prepare = next((label for label in self.widgets
+                            if label.startswith(PREPARE_LABEL_PREFIX) and label.endswith(".svg")), None)
+            if prepare is None:
+                raise RuntimeError(f"Neither '{DOWNLOAD_LABEL}' nor a Prepare button for the SVG was rendered")
+            prepared = await self.click(prepare, "prepare")
+            received, messages = prepared.bytes_received, prepared.messages
+        widget = self._widget(DOWNLOAD_LABEL)
+        url = widget.url
+        if not url and getattr(widget, "deferred_file_id", ""):
+            url = await self._deferred_file_url(widget.deferred_file_id)
+        if not url:
+            return Interaction("download", 0.0, received, messages)
+
+        def fetch() -> int:
+            with urllib.request.urlopen(self.base_url + url, timeout=RERUN_TIMEOUT_SECONDS) as response:
+                return len(response.read())
+
+        size = await asyncio.to_thread(fetch)
+        return Interaction("download", (time.perf_counter() - start) * 1000, received + size, messages + 1)
+
+
+async def run_session(base_url: str, session_number: int, iterations: int) -> SessionResult:
+    result = SessionResult(session_number)
+    try:
+        async with SimulatedSession(base_url, session_number) as session:
+            result.interactions.append(await session.rerun("initial_load"))
+            for iteration in range(iterations):
+                layer = LAYERS[(session_number + iteration + 1) % len(LAYERS)]
+                result.interactions.append(await session.select_layer(layer))
+                for _ in range(3):
+                    result.interactions.append(await session.click(ZOOM_IN_LABEL, "zoom_in"))
+                result.interactions.append(await session.download())
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        logger.warning(f"Session {session_number} failed: {result.error}")
+    return result
+
+
+class RssSampler(threading.Thread):
+    """Samples a process's resident set size from /proc while the load runs"""
+
+    def __init__(self, pid: int, interval: float = 0.25):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples_kb: List[int] = []
+        self._stop_event = threading.Event()
+
+    def read_rss_kb(self) -> Optional[int]:
+        try:
+            with open(f"/proc/{self.pid}/status", encoding="ascii") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1])
+        except OSError:
+            return None
+        return None
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            rss = self.read_rss_kb()
+            if rss is not None:
+                self.samples_kb.append(rss)
+            self._stop_event.wait(self.interval)
+
+    def stop(self) -> Dict:
+        self._stop_event.set()
+        self.join()
+        if not self.samples_kb:
+            return {}
+        return {
+            "start_mb": round(self.samples_kb[0] / 1024, 1),
+            "peak_mb": round(max(self.samples_kb) / 1024, 1),
+            "end_mb": round(self.samples_kb[-1] / 1024, 1),
+        }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int) -> subprocess.Popen:
+    """Launch the app headless with XSRF disabled so simulated clients can connect without cookies"""
+    app_dir = Path(__file__).parent
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_FILE, "--server.headless", "true",
+         "--server.port", str(port), "--server.enableXsrfProtection", "false",
+         "--server.enableCORS", "false", "--browser.gatherUsageStats", "false"],
+        cwd=app_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    health_url = f"http://127.0.0.1:{port}/_stcore/health"
+    deadline = time.monotonic() + RERUN_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(health_url, timeout=1):
+                return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError("Streamlit server exited during startup") from None
+            time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError("Streamlit server did not become healthy in time")
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(results: List[SessionResult]) -> Dict[str, Dict]:
+    by_name: Dict[str, List[Interaction]] = {}
+    for result in results:
+        for interaction in result.interactions:
+            by_name.setdefault(interaction.name, []).append(interaction)
+    summary = {}
+    for name, interactions in by_name.items():
+        latencies = [i.latency_ms for i in interactions]
+        sizes = [i.bytes_received for i in interactions]
+        summary[name] = {
+            "count": len(interactions),
+            "p50_ms": round(percentile(latencies, 0.50), 1),
+            "p90_ms": round(percentile(latencies, 0.90), 1),
+            "p99_ms": round(percentile(latencies, 0.99), 1),
+            "max_ms": round(max(latencies), 1),
+            "mean_bytes": int(statistics.mean(sizes)),
+            "max_bytes": max(sizes),
+        }
+    return summary
+
+
+async def run_load(base_url: str, sessions: int, iterations: int, ramp_up: float) -> List[SessionResult]:
+    async def delayed(number: int) -> SessionResult:
+        await asyncio.sleep(ramp_up * number / max(1, sessions))
+        return await run_session(base_url, number, iterations)
+
+    return list(await asyncio.gather(*(delayed(n) for n in range(sessions))))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent simulated sessions")
+    parser.add_argument("--iterations", type=int, default=3, help="Flow repetitions per session")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Seconds over which sessions connect")
+    parser.add_argument("--url", help="Target an existing server instead of starting one")
+    parser.add_argument("--server-pid", type=int, help="PID to sample RSS from when using --url")
+    parser.add_argument("--output", help="Report path (default load_test_results/<timestamp>.json)")
+    parser.add_argument("--raw", action="store_true", help="Include every individual interaction in the report")
+    args = parser.parse_args(argv)
+
+    process = None
+    if args.url:
+        base_url, server_pid = args.url, args.server_pid
+    else:
+        port = _free_port()
+        process = start_server(port)
+        base_url, server_pid = f"http://127.0.0.1:{port}", process.pid
+        logger.info(f"Started {APP_FILE} on port {port} (pid {server_pid})")
+
+    sampler = RssSampler(server_pid) if server_pid else None
+    if sampler:
+        sampler.start()
+    started = time.perf_counter()
+    try:
+        results = asyncio.run(run_load(base_url, args.sessions, args.iterations, args.ramp_up))
+    finally:
+        rss = sampler.stop() if sampler else {}
+        if process:
+            process.terminate()
+            process.wait(timeout=30)
+
+    report = {
+        "created_at": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "sessions": args.sessions,
+        "iterations": args.iterations,
+        "duration_seconds": round(time.perf_counter() - started, 2),
+        "failed_sessions": sum(1 for r in results if r.error),
+        "server_rss": rss,
+        "interactions": summarize(results),
+        "errors": [r.error for r in results if r.error],
+        "raw": [asdict(r) for r in results] if args.raw else [],
+    }
+
+    output = Path(args.output or Path(RESULTS_DIR) / f"{dt.datetime.now():%Y%m%d_%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    for name, stats in report["interactions"].items():
+        logger.info(f"{name:<14} n={stats['count']:<5} p50={stats['p50_ms']}ms p90={stats['p90_ms']}ms "
+                    f"p99={stats['p99_ms']}ms bytes~{stats['mean_bytes']:,}")
+    if rss:
+        logger.info(f"Server RSS: start {rss['start_mb']} MB, peak {rss['peak_mb']} MB, end {rss['end_mb']} MB")
+    logger.info(f"Wrote load test report to {output}")
+    return 1 if report["failed_sessions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""Parse the Mermaid ER diagram sources into a lightweight schema model.
+
+The ``*_er_diagram.mmd`` files are the single source of truth for the Bronze,
+Silver and Gold table definitions. This module turns them into plain Python
+objects so tooling (benchmarks, integrity checks, DDL generation, profiling)
+can work from the same definitions the diagrams are rendered from.
+"""
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+LAYER_FILES = {
+    "bronze": "bronze_layer_er_diagram.mmd",
+    "silver": "silver_layer_er_diagram.mmd",
+    "gold": "gold_layer_er_diagram.mmd",
+}
+
+_ENTITY_START = re.compile(r"^\s*([A-Z][A-Z0-9_]*)\s*\{\s*$")
+_ATTRIBUTE = re.compile(r"^\s*(\w+)\s+(\w+)((?:\s+(?:PK|FK|UK)\b)*)\s*$")
+_RELATIONSHIP = re.compile(
+    r'^\s*([A-Z][A-Z0-9_]*)\s+([|}o]{2})--([|{o]{2})\s+([A-Z][A-Z0-9_]*)\s*:\s*"([^"]*)"\s*$'
+)
+
+
+@dataclass(frozen=True)
+class Attribute:
+    """A single column of an entity"""
+
+    name: str
+    type: str
+    keys: Tuple[str, ...] = ()
+
+    @property
+    def is_primary_key(self) -> bool:
+        return "PK" in self.keys
+
+    @property
+    def is_unique_key(self) -> bool:
+        return "UK" in self.keys
+
+    @property
+    def is_foreign_key(self) -> bool:
+        return "FK" in self.keys
+
+
+@dataclass
+class Entity:
+    """A table declared in an ER diagram"""
+
+    name: str
+    attributes: List[Attribute] = field(default_factory=list)
+
+    def column(self, name: str) -> Optional[Attribute]:
+        for attribute in self.attributes:
+            if attribute.name == name:
+                return attribute
+        return None
+
+    @property
+    def column_names(self) -> List[str]:
+        return [attribute.name for attribute in self.attributes]
+
+    @property
+    def primary_key(self) -> List[str]:
+        return [a.name for a in self.attributes if a.is_primary_key]
+
+    @property
+    def unique_keys(self) -> List[str]:
+        return [a.name for a in self.attributes if a.is_unique_key]
+
+
+@dataclass(frozen=True)
+class Relationship:
+    """A foreign key relationship, resolved to parent (referenced) and child (referencing) tables
+
+    ``column`` is the referencing column on the child as written in the
+    diagram label; ``parent_column`` is the key it points at on the parent.
+    """
+
+    child: str
+    parent: str
+    column: str
+    parent_column: str
+    child_cardinality: str
+    parent_cardinality: str
+
+    @property
+    def optional(self) -> bool:
+        """True when the child may reference no parent (``o|`` / ``o{`` on the parent side)"""
+        return "o" in self.parent_cardinality
+
+
+@dataclass
+class LayerSchema:
+    """All entities and relationships of one layer diagram"""
+
+    layer: str
+    entities: Dict[str, Entity] = field(default_factory=dict)
+    relationships: List[Relationship] = field(default_factory=list)
+
+    def entity(self, name: str) -> Entity:
+        try:
+            return self.entities[name]
+        except KeyError:
+            raise KeyError(f"Entity {name} is not defined in the {self.layer} layer") from None
+
+
+def _resolve_relationship(
+    entities: Dict[str, Entity], left: str, left_card: str, right_card: str, right: str, column: str
+) -> Relationship:
+    """Work out which side owns the key.
+
+    The diagrams always name the join column in the label, but do not agree on
+    the direction (``FACT_SALES ||--|| DIM_CUSTOMER`` vs
+    ``REFINED_SOCIAL_MEDIA_POSTS ||--|| REFINED_SENTIMENT_ANALYSIS``), so the
+    parent is the side where the column is a primary or unique key.
+    """
+    def is_key(entity_name: str) -> bool:
+        entity = entities.get(entity_name)
+        attribute = entity.column(column) if entity else None
+        return bool(attribute and (attribute.is_primary_key or attribute.is_unique_key))
+
+    def parent_column(entity_name: str) -> str:
+        # Role-playing keys such as ``transaction_date_key`` reference the parent's primary key
+        entity = entities.get(entity_name)
+        if entity is None or entity.column(column) or not entity.primary_key:
+            return column
+        return entity.primary_key[0]
+
+    if is_key(left) and not is_key(right):
+        return Relationship(child=right, parent=left, column=column, parent_column=parent_column(left),
+                            child_cardinality=right_card, parent_cardinality=left_card)
+    return Relationship(child=left, parent=right, column=column, parent_column=parent_column(right),
+                        child_cardinality=left_card, parent_cardinality=right_card)
+
+
+def parse_mermaid(text: str, layer: str = "") -> LayerSchema:
+    """Parse the text of a Mermaid ``erDiagram`` into a LayerSchema"""
+    schema = LayerSchema(layer=layer)
+    pending: List[Tuple[str, str, str, str, str]] = []
+    current: Optional[Entity] = None
+
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        stripped = line.strip()
+        if not stripped or stripped == "erDiagram" or stripped.startswith("%%"):
+            continue
+
+        if current is not None:
+            if stripped == "}":
+                schema.entities[current.name] = current
+                current = None
+                continue
+            match = _ATTRIBUTE.match(line)
+            if not match:
+                raise ValueError(f"Line {line_number}: cannot parse attribute: {stripped}")
+            attr_type, attr_name, keys = match.groups()
+            current.attributes.append(Attribute(attr_name, attr_type, tuple(keys.split())))
+            continue
+
+        match = _ENTITY_START.match(line)
+        if match:
+            current = Entity(match.group(1))
+            continue
+
+        match = _RELATIONSHIP.match(line)
+        if match:
+            pending.append(match.groups())
+            continue
+
+        raise ValueError(f"Line {line_number}: unrecognised diagram statement: {stripped}")
+
+    if current is not None:
+        raise ValueError(f"Entity {current.name} is missing its closing brace")
+
+    for left, left_card, right_card, right, column in pending:
+        schema.relationships.append(
+            _resolve_relationship(schema.entities, left, left_card, right_card, right, column)
+        )
+    return schema
+
+
+def layer_path(layer: str, base_dir: Optional[str] = None) -> Path:
+    """Path of a layer's ``.mmd`` file, defaulting to the directory next to this module"""
+    try:
+        file_name = LAYER_FILES[layer]
+    except KeyError:
+        raise ValueError(f"Unknown layer '{layer}', expected one of {sorted(LAYER_FILES)}") from None
+    return Path(base_dir if base_dir is not None else Path(__file__).parent) / file_name
+
+
+def load_layer(layer: str, base_dir: Optional[str] = None) -> LayerSchema:
+    """Load one of the bronze/silver/gold diagrams from disk"""
+    return parse_mermaid(layer_path(layer, base_dir).read_text(encoding="utf-8"), layer=layer)
+
+
+def load_all_layers(base_dir: Optional[str] = None) -> Dict[str, LayerSchema]:
+    """Load every layer diagram keyed by layer name"""
+    return {layer: load_layer(layer, base_dir) for layer in LAYER_FILES}
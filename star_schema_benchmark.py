@@ -0,0 +1,389 @@
+"""Benchmark representative BI queries against the Gold star schema.
+
+Synthetic data is generated from ``gold_layer_er_diagram.mmd`` at one or more
+scale factors and loaded into a local SQLite database under several physical
+layouts. Each query is timed per layout and the results are written to a JSON
+report so runs can be compared against a saved baseline.
+
+Usage:
+    python star_schema_benchmark.py --scale 0.1 --scale 1
+    python star_schema_benchmark.py --baseline benchmark_results/baseline.json
+"""
+
+import argparse
+import datetime as dt
+import hashlib
+import json
+import logging
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from mermaid_schema import Entity, LayerSchema, layer_path, load_layer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = "benchmark_results"
+DEFAULT_REGRESSION_THRESHOLD = 1.25
+
+# Rows per table at scale factor 1
+BASE_ROW_COUNTS = {
+    "DIM_CUSTOMER": 5_000,
+    "DIM_PRODUCT": 200,
+    "DIM_SERVICE": 50,
+    "DIM_CERTIFICATION": 30,
+    "DIM_TRAINING": 80,
+    "DIM_SALES_REP": 40,
+    "DIM_GEOGRAPHY": 500,
+    "FACT_SALES": 100_000,
+    "FACT_SOCIAL_SENTIMENT": 50_000,
+    "FACT_CUSTOMER_ENGAGEMENT": 50_000,
+}
+
+DATE_RANGE_START = dt.date(2022, 1, 1)
+DATE_RANGE_DAYS = 3 * 365
+
+PRODUCT_CATEGORIES = ["Apparel", "Equipment", "Nutrition", "Books", "Digital"]
+CUSTOMER_TIERS = ["Bronze", "Silver", "Gold", "Platinum"]
+ENGAGEMENT_TIERS = ["Champion", "Loyal", "Active", "At Risk", "Dormant"]
+PLATFORMS = ["Twitter", "TikTok", "Facebook"]
+SENTIMENT_CATEGORIES = ["Positive", "Neutral", "Negative"]
+OFFERING_KEYS = ["product_key", "service_key", "certification_key", "training_key"]
+
+# Physical layouts: how fact tables are ordered on disk and how keys are typed.
+# SQLite WITHOUT ROWID tables are stored in primary key order, which is the
+# closest local analogue to a Snowflake clustering key.
+LAYOUTS = {
+    "heap_int_keys": {"cluster": None, "string_keys": False},
+    "date_clustered": {"cluster": "date", "string_keys": False},
+    "customer_clustered": {"cluster": "customer", "string_keys": False},
+    "date_clustered_string_keys": {"cluster": "date", "string_keys": True},
+}
+
+FACT_DATE_COLUMNS = {
+    "FACT_SALES": "transaction_date_key",
+    "FACT_SOCIAL_SENTIMENT": "post_date_key",
+    "FACT_CUSTOMER_ENGAGEMENT": "date_key",
+}
+
+QUERIES = {
+    "revenue_by_fiscal_quarter_and_category": """
+        SELECT d.fiscal_quarter, p.product_category,
+               SUM(f.net_amount) AS revenue, COUNT(*) AS transactions
+        FROM FACT_SALES f
+        JOIN DIM_DATE d ON d.date_key = f.transaction_date_key
+        JOIN DIM_PRODUCT p ON p.product_key = f.product_key
+        GROUP BY d.fiscal_quarter, p.product_category
+        ORDER BY d.fiscal_quarter, p.product_category
+    """,
+    "sentiment_trend_by_platform": """
+        SELECT sp.platform_name, d.year, d.month,
+               AVG(f.sentiment_score) AS avg_sentiment, SUM(f.engagement_count) AS engagement
+        FROM FACT_SOCIAL_SENTIMENT f
+        JOIN DIM_SOCIAL_PLATFORM sp ON sp.platform_key = f.platform_key
+        JOIN DIM_DATE d ON d.date_key = f.post_date_key
+        GROUP BY sp.platform_name, d.year, d.month
+        ORDER BY sp.platform_name, d.year, d.month
+    """,
+    "engagement_tiers_by_customer_tier": """
+        SELECT f.engagement_tier, c.customer_tier,
+               COUNT(DISTINCT f.customer_key) AS customers, SUM(f.total_revenue) AS revenue
+        FROM FACT_CUSTOMER_ENGAGEMENT f
+        JOIN DIM_CUSTOMER c ON c.customer_key = f.customer_key
+        GROUP BY f.engagement_tier, c.customer_tier
+        ORDER BY f.engagement_tier, c.customer_tier
+    """,
+    "last_quarter_revenue_by_channel": """
+        SELECT f.sales_channel, SUM(f.net_amount) AS revenue
+        FROM FACT_SALES f
+        JOIN DIM_DATE d ON d.date_key = f.transaction_date_key
+        WHERE d.full_date >= :quarter_start
+        GROUP BY f.sales_channel
+        ORDER BY revenue DESC
+    """,
+    "single_customer_history": """
+        SELECT d.full_date, f.net_amount, f.sales_channel
+        FROM FACT_SALES f
+        JOIN DIM_DATE d ON d.date_key = f.transaction_date_key
+        WHERE f.customer_key = :customer_key
+        ORDER BY d.full_date
+    """,
+}
+
+SQLITE_TYPES = {
+    "string": "TEXT",
+    "decimal": "REAL",
+    "int": "INTEGER",
+    "datetime": "TEXT",
+    "date": "TEXT",
+    "boolean": "INTEGER",
+}
+
+
+def is_surrogate_key(column: str, column_type: str) -> bool:
+    """Integer ``*_key`` columns are the star schema joins"""
+    return column_type == "int" and column.endswith("_key")
+
+
+def encode_key(value: Optional[int], string_keys: bool):
+    """Represent a surrogate key as an integer or as a fixed-width business-style string"""
+    if value is None or not string_keys:
+        return value
+    return f"K{value:010d}"
+
+
+def date_key(day: dt.date) -> int:
+    return day.year * 10_000 + day.month * 100 + day.day
+
+
+def fiscal_quarter(day: dt.date) -> str:
+    """Fiscal year starts in July"""
+    fiscal_year = day.year + 1 if day.month >= 7 else day.year
+    quarter = ((day.month - 7) % 12) // 3 + 1
+    return f"FY{fiscal_year}-Q{quarter}"
+
+
+def _default_value(rng: random.Random, column_type: str, column: str):
+    if column_type == "int":
+        return rng.randint(0, 1_000)
+    if column_type == "decimal":
+        return round(rng.uniform(1, 500), 2)
+    if column_type == "boolean":
+        return rng.random() < 0.5
+    if column_type == "date":
+        return (DATE_RANGE_START + dt.timedelta(days=rng.randrange(DATE_RANGE_DAYS))).isoformat()
+    if column_type == "datetime":
+        day = DATE_RANGE_START + dt.timedelta(days=rng.randrange(DATE_RANGE_DAYS))
+        return f"{day.isoformat()} {rng.randrange(24):02d}:{rng.randrange(60):02d}:00"
+    return f"{column}_{rng.randrange(50)}"
+
+
+def _date_rows() -> Iterator[Dict]:
+    for offset in range(DATE_RANGE_DAYS):
+        day = DATE_RANGE_START + dt.timedelta(days=offset)
+        quarter = (day.month - 1) // 3 + 1
+        yield {
+            "date_key": date_key(day),
+            "full_date": day.isoformat(),
+            "year": day.year,
+            "quarter": quarter,
+            "month": day.month,
+            "week": day.isocalendar()[1],
+            "day": day.day,
+            "month_name": day.strftime("%B"),
+            "day_name": day.strftime("%A"),
+            "quarter_name": f"Q{quarter}",
+            "day_of_year": day.timetuple().tm_yday,
+            "week_of_year": day.isocalendar()[1],
+            "is_weekend": day.weekday() >= 5,
+            "fiscal_year": fiscal_quarter(day)[:6],
+            "fiscal_quarter": fiscal_quarter(day),
+            "fiscal_period": fiscal_quarter(day),
+        }
+
+
+def generate_rows(entity: Entity, row_count: int, rng: random.Random,
+                  dimension_sizes: Dict[str, int]) -> Iterator[Dict]:
+    """Yield synthetic rows for a Gold entity, keeping surrogate keys referentially valid"""
+    if entity.name == "DIM_DATE":
+        yield from _date_rows()
+        return
+    if entity.name == "DIM_SOCIAL_PLATFORM":
+        row_count = len(PLATFORMS)
+
+    date_keys = [date_key(DATE_RANGE_START + dt.timedelta(days=d)) for d in range(DATE_RANGE_DAYS)]
+    pk = entity.primary_key[0]
+    overrides: Dict[str, Callable[[int], object]] = {
+        "product_category": lambda i: rng.choice(PRODUCT_CATEGORIES),
+        "customer_tier": lambda i: rng.choice(CUSTOMER_TIERS),
+        "engagement_tier": lambda i: rng.choice(ENGAGEMENT_TIERS),
+        "sentiment_category": lambda i: rng.choice(SENTIMENT_CATEGORIES),
+        "sentiment_score": lambda i: round(rng.uniform(-1, 1), 3),
+        "platform_name": lambda i: PLATFORMS[i - 1],
+        "sales_channel": lambda i: rng.choice(["Online", "Retail", "Partner", "Phone"]),
+    }
+
+    for i in range(1, row_count + 1):
+        row: Dict[str, object] = {}
+        offering = rng.choice(OFFERING_KEYS) if entity.name.startswith("FACT_") else None
+        for attribute in entity.attributes:
+            name, column_type = attribute.name, attribute.type
+            if name == pk:
+                row[name] = i if column_type == "int" else f"{entity.name}-{i}"
+            elif name in FACT_DATE_COLUMNS.values() and attribute.is_foreign_key:
+                row[name] = rng.choice(date_keys)
+            elif is_surrogate_key(name, column_type) and attribute.is_foreign_key:
+                if name in OFFERING_KEYS and name != offering:
+                    row[name] = None
+                else:
+                    row[name] = rng.randint(1, dimension_sizes[name])
+            elif name in overrides:
+                row[name] = overrides[name](i)
+            else:
+                row[name] = _default_value(rng, column_type, name)
+        yield row
+
+
+def _dimension_sizes(schema: LayerSchema, counts: Dict[str, int]) -> Dict[str, int]:
+    sizes = {}
+    for entity in schema.entities.values():
+        if entity.name.startswith("DIM_") and entity.name in counts:
+            sizes[entity.primary_key[0]] = counts[entity.name]
+    sizes["platform_key"] = len(PLATFORMS)
+    return sizes
+
+
+def create_table(conn: sqlite3.Connection, entity: Entity, layout: Dict) -> None:
+    columns = []
+    for attribute in entity.attributes:
+        sql_type = SQLITE_TYPES.get(attribute.type, "TEXT")
+        if layout["string_keys"] and is_surrogate_key(attribute.name, attribute.type):
+            sql_type = "TEXT"
+        columns.append(f"{attribute.name} {sql_type}")
+
+    pk = entity.primary_key[0]
+    cluster_column = None
+    if layout["cluster"] == "date":
+        cluster_column = FACT_DATE_COLUMNS.get(entity.name)
+    elif layout["cluster"] == "customer" and entity.column("customer_key") and entity.name.startswith("FACT_"):
+        cluster_column = "customer_key"
+
+    if cluster_column:
+        columns.append(f"PRIMARY KEY ({cluster_column}, {pk})")
+        suffix = " WITHOUT ROWID"
+    else:
+        columns.append(f"PRIMARY KEY ({pk})")
+        suffix = ""
+    conn.execute(f"CREATE TABLE {entity.name} ({', '.join(columns)}){suffix}")
+
+
+def build_database(scale: float, layout_name: str, seed: int = 42, path: str = ":memory:") -> sqlite3.Connection:
+    """Generate the Gold model at the given scale factor into a fresh SQLite database"""
+    layout = LAYOUTS[layout_name]
+    schema = load_layer("gold")
+    counts = {name: max(1, int(rows * scale)) for name, rows in BASE_ROW_COUNTS.items()}
+    sizes = _dimension_sizes(schema, counts)
+    rng = random.Random(seed)
+
+    conn = sqlite3.connect(path)
+    for entity in schema.entities.values():
+        create_table(conn, entity, layout)
+        rows = generate_rows(entity, counts.get(entity.name, 0), rng, sizes)
+        key_columns = [a.name for a in entity.attributes if is_surrogate_key(a.name, a.type)]
+        if layout["string_keys"]:
+            rows = ({k: (encode_key(v, True) if k in key_columns else v) for k, v in row.items()} for row in rows)
+        placeholders = ", ".join(f":{name}" for name in entity.column_names)
+        conn.executemany(
+            f"INSERT INTO {entity.name} ({', '.join(entity.column_names)}) VALUES ({placeholders})",
+            ({name: row.get(name) for name in entity.column_names} for row in rows),
+        )
+    conn.commit()
+    conn.execute("ANALYZE")
+    return conn
+
+
+def time_query(conn: sqlite3.Connection, sql: str, params: Dict, repeat: int) -> Dict:
+    timings = []
+    row_count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        row_count = len(conn.execute(sql, params).fetchall())
+        timings.append(time.perf_counter() - start)
+    return {
+        "min_ms": round(min(timings) * 1000, 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "rows": row_count,
+    }
+
+
+def schema_fingerprint() -> str:
+    """Hash of the Gold diagram so reports from different schema versions are distinguishable"""
+    return hashlib.sha256(layer_path("gold").read_bytes()).hexdigest()[:16]
+
+
+def run_benchmark(scales: Sequence[float], layouts: Sequence[str], repeat: int = 5, seed: int = 42) -> Dict:
+    results: List[Dict] = []
+    for scale in scales:
+        for layout_name in layouts:
+            logger.info(f"Building scale {scale} with layout {layout_name}")
+            build_start = time.perf_counter()
+            conn = build_database(scale, layout_name, seed)
+            build_seconds = time.perf_counter() - build_start
+            params = {
+                "quarter_start": (DATE_RANGE_START + dt.timedelta(days=DATE_RANGE_DAYS - 91)).isoformat(),
+                "customer_key": encode_key(1, LAYOUTS[layout_name]["string_keys"]),
+            }
+            for query_name, sql in QUERIES.items():
+                timing = time_query(conn, sql, params, repeat)
+                results.append({"scale": scale, "layout": layout_name, "query": query_name,
+                                "build_seconds": round(build_seconds, 3), **timing})
+                logger.info(f"  {query_name}: {timing['median_ms']} ms (median of {repeat})")
+            conn.close()
+    return {
+        "created_at": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "schema_fingerprint": schema_fingerprint(),
+        "sqlite_version": sqlite3.sqlite_version,
+        "repeat": repeat,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def find_regressions(report: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Compare median timings against a baseline report, keyed by scale/layout/query"""
+    def key(result: Dict):
+        return (result["scale"], result["layout"], result["query"])
+
+    previous = {key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        old = previous.get(key(result))
+        if not old or old["median_ms"] <= 0:
+            continue
+        ratio = result["median_ms"] / old["median_ms"]
+        if ratio > threshold:
+            regressions.append(
+                f"{result['query']} [{result['layout']}, scale {result['scale']}]: "
+                f"{old['median_ms']} ms -> {result['median_ms']} ms ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, action="append", help="Scale factor (repeatable, default 0.1 and 1)")
+    parser.add_argument("--layout", choices=sorted(LAYOUTS), action="append", help="Layout to test (default all)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Report path (default benchmark_results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="Previous report to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help="Median slowdown ratio that counts as a regression")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.scale or [0.1, 1.0], args.layout or list(LAYOUTS), args.repeat, args.seed)
+
+    output = Path(args.output or Path(RESULTS_DIR) / f"{dt.datetime.now():%Y%m%d_%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    logger.info(f"Wrote benchmark report to {output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        if baseline.get("schema_fingerprint") != report["schema_fingerprint"]:
+            logger.warning("Baseline was recorded against a different Gold schema version")
+        regressions = find_regressions(report, baseline, args.threshold)
+        for regression in regressions:
+            logger.error(f"Regression: {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Per-file cache invalidation, change detection and targeted session reruns."""
+
+import inspect
+import threading
+import time
+
+import pytest
+
+from asset_watcher import DIRECTORY_LISTING, AssetCache, HotReloader, PollingWatcher, request_session_rerun
+
+
+def test_value_loaded_across_an_invalidation_is_not_cached():
+    cache = AssetCache()
+    loading, release = threading.Event(), threading.Event()
+
+    def slow_load():
+        loading.set()
+        release.wait(5)
+        return "before edit"
+
+    loaded = []
+    reader = threading.Thread(target=lambda: loaded.append(cache.get("gold.svg", "preview", slow_load)))
+    reader.start()
+    loading.wait(5)
+    cache.invalidate("gold.svg")  # the file changed while it was being read
+    release.set()
+    reader.join()
+
+    assert loaded == ["before edit"]
+    assert cache.get("gold.svg", "preview", lambda: "after edit") == "after edit"
+    assert cache.get("gold.svg", "preview", lambda: "not loaded again") == "after edit"
+
+
+def test_invalidation_only_drops_the_changed_file():
+    cache = AssetCache()
+    cache.get("gold.svg", "preview", lambda: "gold")
+    cache.get("silver.svg", "preview", lambda: "silver")
+
+    cache.invalidate("gold.svg")
+
+    assert cache.get("gold.svg", "preview", lambda: "gold v2") == "gold v2"
+    assert cache.get("silver.svg", "preview", lambda: "reloaded") == "silver"
+
+
+def test_polling_watcher_reports_changed_files(tmp_path):
+    (tmp_path / "gold.mmd").write_text("erDiagram\n", encoding="utf-8")
+    changes = []
+    changed = threading.Event()
+    watcher = PollingWatcher(str(tmp_path), lambda names: (changes.append(names), changed.set()), interval=0.02)
+    watcher.start()
+    try:
+        time.sleep(0.05)
+        (tmp_path / "gold.mmd").write_text("erDiagram\n    DIM_DATE {\n    }\n", encoding="utf-8")
+        (tmp_path / "notes.txt").write_text("not watched", encoding="utf-8")
+        assert changed.wait(5)
+    finally:
+        watcher.stop()
+        watcher.join()
+
+    assert changes[0] == {"gold.mmd"}
+
+
+def test_changes_rerun_only_the_sessions_viewing_them(tmp_path):
+    reruns = []
+    reloader = HotReloader(str(tmp_path), rerun=lambda session_id: reruns.append(session_id) or session_id != "gone")
+    try:
+        reloader.view("bronze-viewer", ["bronze_layer_er_diagram.svg"])
+        reloader.view("gold-viewer", ["gold_layer_er_diagram.mmd", "gold_layer_er_diagram.svg"])
+        reloader.view("gone", ["gold_layer_er_diagram.svg"])
+        reloader.cache.get(DIRECTORY_LISTING, "listing", lambda: ["old"])
+
+        reloader.handle_changes({"gold_layer_er_diagram.svg"})
+        assert sorted(reruns) == ["gold-viewer", "gone"]
+        assert reloader.cache.get(DIRECTORY_LISTING, "listing", lambda: ["new"]) == ["new"]
+
+        reruns.clear()
+        reloader.handle_changes({"gold_layer_er_diagram.svg"})
+        assert reruns == ["gold-viewer"]
+    finally:
+        reloader.stop()
+
+
+def test_rerun_without_a_runtime_reports_the_session_as_gone():
+    pytest.importorskip("streamlit")
+    assert request_session_rerun("no-such-session") is False
+
+
+def test_streamlit_still_provides_the_private_rerun_api():
+    runtime = pytest.importorskip("streamlit.runtime")
+    from streamlit.runtime.app_session import AppSession
+    from streamlit.runtime.session_manager import SessionManager
+
+    assert "self._session_mgr" in inspect.getsource(runtime.Runtime.__init__)
+    assert hasattr(SessionManager, "get_active_session_info")
+    assert "client_state" in inspect.signature(AppSession.request_rerun).parameters
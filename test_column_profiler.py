@@ -0,0 +1,95 @@
+"""Merged sketches must stay close to exact statistics, and stored profiles must refresh incrementally."""
+
+import csv
+import random
+
+import pytest
+
+import column_profiler
+from column_profiler import HyperLogLog, KLLSketch, TableProfile, TopK, refresh_profile
+from mermaid_schema import load_layer
+
+
+def _merged(sketch_type, parts, add):
+    sketches = []
+    for values in parts:
+        sketch = sketch_type()
+        for value in values:
+            add(sketch, value)
+        sketches.append(sketch)
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged.merge(sketch)
+    return merged
+
+
+def test_hyperloglog_merge_estimates_union_distinct_count():
+    parts = [[f"customer-{i}" for i in range(start, start + 20_000)] for start in (0, 10_000, 25_000)]
+    merged = _merged(HyperLogLog, parts, HyperLogLog.add)
+
+    assert merged.estimate() == pytest.approx(45_000, rel=0.05)
+
+
+def test_kll_merge_quantiles_are_within_rank_error():
+    rng = random.Random(7)
+    values = [rng.uniform(0, 1_000) for _ in range(30_000)]
+    merged = _merged(KLLSketch, [values[i::4] for i in range(4)], KLLSketch.add)
+
+    ordered = sorted(values)
+    for fraction, estimate in zip((0.05, 0.5, 0.95), merged.quantiles([0.05, 0.5, 0.95])):
+        rank = sum(1 for v in ordered if v <= estimate) / len(ordered)
+        assert rank == pytest.approx(fraction, abs=0.02)
+
+
+def test_topk_merge_keeps_heavy_hitters():
+    rng = random.Random(11)
+    heavy = ["Online"] * 3_000 + ["Retail"] * 2_000
+    noise = [f"channel-{rng.randrange(5_000)}" for _ in range(5_000)]
+    stream = heavy + noise
+    rng.shuffle(stream)
+    merged = _merged(TopK, [stream[:4_000], stream[4_000:]], TopK.add)
+
+    assert [value for value, _ in merged.top(2)] == ["Online", "Retail"]
+    assert merged.counters["Online"] <= 3_000
+
+
+def _write_partition(path, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["customer_key", "customer_tier", "created_date"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_refresh_profiles_only_new_partitions(tmp_path, monkeypatch):
+    entity = load_layer("gold").entity("DIM_CUSTOMER")
+    partitions = tmp_path / "data" / "DIM_CUSTOMER"
+    partitions.mkdir(parents=True)
+    tiers = ["Gold", "Silver", ""]
+    _write_partition(partitions / "part-1.csv", [
+        {"customer_key": i, "customer_tier": tiers[i % 3], "created_date": "2025-07-21 09:30:00"} for i in range(300)
+    ])
+    profile_path = tmp_path / "profiles" / "DIM_CUSTOMER.json"
+    assert refresh_profile(entity, str(tmp_path / "data"), profile_path).rows == 300
+
+    _write_partition(partitions / "part-2.csv", [
+        {"customer_key": i, "customer_tier": "Gold", "created_date": ""} for i in range(300, 400)
+    ])
+    read = []
+    read_rows = column_profiler.read_rows
+
+    def recording_read_rows(path):
+        read.append(path.name)
+        return read_rows(path)
+
+    monkeypatch.setattr(column_profiler, "read_rows", recording_read_rows)
+    profile = refresh_profile(entity, str(tmp_path / "data"), profile_path)
+
+    assert read == ["part-2.csv"]
+    assert profile.rows == 400
+    customer_key, tier = profile.columns["customer_key"], profile.columns["customer_tier"]
+    assert (customer_key.min_value, customer_key.max_value) == (0, 399)
+    assert tier.nulls == 100
+    assert tier.top_values.top(1) == [("Gold", 200)]
+    assert profile.columns["created_date"].nulls == 100
+    assert TableProfile.load(profile_path).summary() == profile.summary()
+    assert [p.name for p in profile_path.parent.iterdir()] == ["DIM_CUSTOMER.json"]
@@ -0,0 +1,86 @@
+"""Incremental refreshes of FACT_CUSTOMER_ENGAGEMENT must match a full recompute."""
+
+import datetime as dt
+import sqlite3
+
+import pytest
+
+from engagement_aggregator import EngagementAggregator, refresh_sqlite, to_date_key
+from star_schema_benchmark import build_database
+
+FIRST_SNAPSHOT = dt.date(2025, 1, 1)
+SECOND_SNAPSHOT = dt.date(2026, 1, 1)
+FACT_KEYS = {"FACT_SALES": "sales_fact_key", "FACT_SOCIAL_SENTIMENT": "sentiment_fact_key"}
+
+
+def _snapshot(conn: sqlite3.Connection, as_of: dt.date):
+    cursor = conn.execute("SELECT * FROM FACT_CUSTOMER_ENGAGEMENT WHERE date_key = ? ORDER BY customer_key",
+                          (to_date_key(as_of),))
+    columns = [description[0] for description in cursor.description]
+    return [{k: v for k, v in zip(columns, values) if k != "created_date"} for values in cursor]
+
+
+def _insert_copy(conn: sqlite3.Connection, table: str, fact_key: str, **changes) -> None:
+    """Insert a copy of an existing row under a new fact key, with some columns overridden"""
+    cursor = conn.execute(f"SELECT * FROM {table} WHERE customer_key IS NOT NULL LIMIT 1")
+    row = dict(zip([d[0] for d in cursor.description], cursor.fetchone()))
+    row.update(changes, **{FACT_KEYS[table]: fact_key})
+    conn.execute(f"INSERT INTO {table} ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})", list(row.values()))
+
+
+@pytest.fixture
+def conn():
+    conn = build_database(0.01, "heap_int_keys")
+    yield conn
+    conn.close()
+
+
+def test_incremental_refresh_matches_full_recompute(conn, tmp_path):
+    # Hold back the newest facts so they arrive after the first refresh
+    cutoff = conn.execute("SELECT MAX(created_date) FROM FACT_SALES").fetchone()[0][:7]
+    for table in FACT_KEYS:
+        conn.execute(f"CREATE TABLE late_{table} AS SELECT * FROM {table} WHERE created_date >= ?", (cutoff,))
+        conn.execute(f"DELETE FROM {table} WHERE created_date >= ?", (cutoff,))
+
+    state_path = str(tmp_path / "state.json")
+    aggregator = EngagementAggregator()
+    refresh_sqlite(conn, aggregator, FIRST_SNAPSHOT)
+    aggregator.save(state_path)
+
+    # Late rows: newer ones, one stamped exactly at the watermark and undated ones ordered by their event time
+    for table in FACT_KEYS:
+        conn.execute(f"INSERT INTO {table} SELECT * FROM late_{table}")
+    watermark = aggregator.sales_watermark.value
+    _insert_copy(conn, "FACT_SALES", "late-at-watermark", created_date=watermark, is_refunded=0)
+    _insert_copy(conn, "FACT_SALES", "late-undated", created_date=None, transaction_timestamp=watermark,
+                 is_refunded=0)
+    _insert_copy(conn, "FACT_SOCIAL_SENTIMENT", "late-undated", created_date=None,
+                 post_timestamp=aggregator.sentiment_watermark.value)
+
+    incremental = EngagementAggregator.load(state_path)
+    refresh_sqlite(conn, incremental, SECOND_SNAPSHOT)
+    refresh_sqlite(conn, incremental, SECOND_SNAPSHOT)  # re-reading the boundary applies nothing twice
+
+    full_conn = sqlite3.connect(":memory:")
+    conn.backup(full_conn)
+    full_conn.execute("DELETE FROM FACT_CUSTOMER_ENGAGEMENT WHERE date_key = ?", (to_date_key(SECOND_SNAPSHOT),))
+    refresh_sqlite(full_conn, EngagementAggregator(), SECOND_SNAPSHOT)
+
+    assert _snapshot(conn, SECOND_SNAPSHOT) == _snapshot(full_conn, SECOND_SNAPSHOT)
+    assert len(_snapshot(conn, SECOND_SNAPSHOT)) == len(incremental.states)
+    # The state keeps only the keys at the watermark itself, not one per applied row
+    watermark = incremental.sales_watermark
+    at_watermark = {key for (key,) in conn.execute(
+        "SELECT sales_fact_key FROM FACT_SALES WHERE COALESCE(created_date, transaction_timestamp) = ?",
+        (watermark.value,))}
+    assert watermark.boundary_keys == at_watermark
+
+
+def test_new_snapshot_date_rederives_customers_without_new_facts(conn):
+    aggregator = EngagementAggregator()
+    refresh_sqlite(conn, aggregator, FIRST_SNAPSHOT)
+
+    later = dt.date(2027, 1, 1)
+    assert refresh_sqlite(conn, aggregator, later) == len(aggregator.states)
+    assert {row["engagement_tier"] for row in _snapshot(conn, later)} == {"Dormant"}
+    assert refresh_sqlite(conn, aggregator, later) == 0
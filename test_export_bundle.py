@@ -0,0 +1,93 @@
+"""Content-hashed export bundles: cache hits, rebuilds on change and concurrent builds."""
+
+import os
+import threading
+import zipfile
+
+import pytest
+
+import export_bundle
+from export_bundle import BUNDLE_PREFIX, build_bundle, list_members, read_bundle
+
+
+@pytest.fixture
+def artifacts(tmp_path, monkeypatch):
+    base_dir = tmp_path / "app"
+    base_dir.mkdir()
+    (base_dir / "gold_layer_er_diagram.mmd").write_text("erDiagram\n    DIM_DATE {\n    }\n", encoding="utf-8")
+    (base_dir / "README.md").write_text("# Medallion\n", encoding="utf-8")
+    monkeypatch.setattr(export_bundle, "ARTIFACT_FILES", ["gold_layer_er_diagram.mmd", "README.md"])
+    monkeypatch.setattr(export_bundle, "GENERATED_ARTIFACTS", {"ddl/gold_layer.sql": lambda: "CREATE TABLE t (x INT);\n"})
+    return base_dir
+
+
+def test_unchanged_artifacts_are_served_from_the_cache(artifacts, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    first = build_bundle(cache_dir, artifacts)
+    built_at = first.stat().st_mtime_ns
+
+    again = build_bundle(cache_dir, artifacts)
+
+    assert again == first and again.stat().st_mtime_ns == built_at
+    assert again.name.startswith(BUNDLE_PREFIX)
+    assert sorted(list_members(again)) == ["README.md", "ddl/gold_layer.sql", "gold_layer_er_diagram.mmd"]
+    with zipfile.ZipFile(again) as archive:
+        assert archive.read("ddl/gold_layer.sql") == b"CREATE TABLE t (x INT);\n"
+
+
+def test_changed_artifact_gets_a_new_bundle_and_prunes_the_old_one(artifacts, tmp_path):
+    cache_dir = tmp_path / "cache"
+    first = build_bundle(str(cache_dir), artifacts)
+    (artifacts / "README.md").write_text("# Medallion, revised\n", encoding="utf-8")
+
+    second = build_bundle(str(cache_dir), artifacts)
+
+    assert second != first
+    assert [p.name for p in cache_dir.iterdir()] == [second.name]
+    with zipfile.ZipFile(second) as archive:
+        assert archive.read("README.md") == b"# Medallion, revised\n"
+
+
+def test_concurrent_builds_share_one_bundle(artifacts, tmp_path):
+    # Large enough that the builds overlap while the archive is being written
+    (artifacts / "README.md").write_bytes(os.urandom(8 * 1024 * 1024))
+    cache_dir = tmp_path / "cache"
+    start = threading.Barrier(8)
+    paths, errors = [], []
+
+    def build():
+        start.wait()
+        try:
+            paths.append(build_bundle(str(cache_dir), artifacts))
+        except Exception as e:  # surfaced by the assertion below
+            errors.append(e)
+
+    threads = [threading.Thread(target=build) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(set(paths)) == 1
+    assert [p.name for p in cache_dir.iterdir()] == [paths[0].name]
+    with zipfile.ZipFile(paths[0]) as archive:
+        assert archive.testzip() is None
+
+
+def test_read_rebuilds_a_bundle_pruned_before_it_was_read(artifacts, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    expected = build_bundle(cache_dir, artifacts).read_bytes()
+    builds = []
+
+    def build_then_prune(cache_dir, base_dir):
+        path = build_bundle(cache_dir, base_dir)
+        if not builds:
+            path.unlink()  # a concurrent build of newer artifacts removed it
+        builds.append(path)
+        return path
+
+    monkeypatch.setattr(export_bundle, "build_bundle", build_then_prune)
+
+    assert read_bundle(cache_dir, artifacts) == expected
+    assert len(builds) == 2
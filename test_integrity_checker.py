@@ -0,0 +1,81 @@
+"""Orphan detection over small CSV extracts, with both the Bloom and the sorted key sets."""
+
+import csv
+
+import pytest
+
+import integrity_checker
+from integrity_checker import check_child_table, check_layer
+from mermaid_schema import Relationship, load_layer
+
+CUSTOMER = Relationship("FACT_SALES", "DIM_CUSTOMER", "customer_key", "customer_key", "||", "||")
+PRODUCT = Relationship("FACT_SALES", "DIM_PRODUCT", "product_key", "product_key", "||", "o|")
+
+
+def _write_csv(path, header, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    _write_csv(tmp_path / "DIM_CUSTOMER.csv", ["customer_key", "name"], [[k, f"c{k}"] for k in range(1, 6)])
+    _write_csv(tmp_path / "DIM_PRODUCT.csv", ["product_key"], [[1], [2], [3]])
+    _write_csv(tmp_path / "FACT_SALES.csv", ["sales_fact_key", "customer_key", "product_key"], [
+        ["s1", 1, 1],
+        ["s2", 2, ""],
+        ["s3", 99, 3],
+        ["s4", 99, 42],
+        ["s5", "", 2],
+        ["s6", 5, 43],
+    ])
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize("method", ["bloom", "sorted"])
+def test_orphans_and_nulls_per_relationship(data_dir, method):
+    customer, product = check_child_table("FACT_SALES", [CUSTOMER, PRODUCT], data_dir, method)
+
+    assert (customer.child_rows, customer.parent_keys) == (6, 5)
+    assert (customer.orphan_rows, customer.orphan_samples, customer.null_keys) == (2, ["99"], 1)
+    assert customer.status == "violations"
+    assert "NULL keys in a mandatory relationship" in customer.message
+
+    assert (product.child_rows, product.parent_keys) == (6, 3)
+    assert (product.orphan_rows, product.orphan_samples, product.null_keys) == (2, ["42", "43"], 1)
+    assert product.status == "violations" and product.message == ""
+
+
+def test_child_table_is_streamed_once_for_all_relationships(data_dir, monkeypatch):
+    reads = []
+    stream_columns = integrity_checker.stream_columns
+
+    def recording_stream_columns(path, columns):
+        reads.append((path.name, tuple(columns)))
+        return stream_columns(path, columns)
+
+    monkeypatch.setattr(integrity_checker, "stream_columns", recording_stream_columns)
+    check_child_table("FACT_SALES", [CUSTOMER, PRODUCT], data_dir, "sorted")
+
+    assert [columns for name, columns in reads if name == "FACT_SALES.csv"] == [("customer_key", "product_key")]
+
+
+def test_missing_parent_is_skipped_without_affecting_other_relationships(data_dir):
+    training = Relationship("FACT_SALES", "DIM_TRAINING", "product_key", "training_key", "||", "o|")
+    customer, skipped = check_child_table("FACT_SALES", [CUSTOMER, training], data_dir, "sorted")
+
+    assert customer.orphan_rows == 2
+    assert (skipped.status, skipped.message) == ("skipped", "Missing data for DIM_TRAINING")
+
+
+def test_layer_results_follow_diagram_order(data_dir):
+    results = check_layer("gold", data_dir, "sorted", workers=2)
+
+    relationships = load_layer("gold").relationships
+    assert [(r.child, r.column, r.parent) for r in results] == [
+        (r.child, r.column, r.parent) for r in relationships
+    ]
+    checked = {(r.column, r.parent): r.status for r in results if r.status != "skipped"}
+    assert checked == {("customer_key", "DIM_CUSTOMER"): "violations", ("product_key", "DIM_PRODUCT"): "violations"}
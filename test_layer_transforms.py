@@ -0,0 +1,33 @@
+"""Bronze to Silver record-batch transforms."""
+
+import datetime as dt
+
+import pyarrow as pa
+
+from arrow_schema import SchemaRegistry
+from layer_transforms import run_transform
+
+REGISTRY = SchemaRegistry()
+
+
+def test_twitter_engagement_treats_missing_counts_as_zero():
+    batch = pa.RecordBatch.from_pydict({
+        "tweet_id": ["1", "2", "3"],
+        "user_id": [" u1 ", "u2", "u3"],
+        "username": ["Alice", "BOB", None],
+        "tweet_text": ["Loving my NASM course", "gym day", None],
+        "retweet_count": [1, None, None],
+        "like_count": [2, 3, None],
+        "reply_count": [None, 4, None],
+        "created_at": [dt.datetime(2025, 7, 21, 9, 30)] * 3,
+        "ingested_at": [dt.datetime(2025, 7, 22)] * 3,
+        "source_api": ["twitter_api"] * 3,
+    })
+
+    (refined,) = run_transform("RAW_TWITTER_POSTS", [batch], REGISTRY)
+
+    assert refined.schema == REGISTRY.schema("REFINED_SOCIAL_MEDIA_POSTS")
+    assert refined.column("engagement_score").to_pylist() == [3, 7, 0]
+    assert refined.column("platform_std").to_pylist() == ["TWITTER"] * 3
+    assert refined.column("post_key").to_pylist() == ["twitter:1", "twitter:2", "twitter:3"]
+    assert refined.column("contains_nasm_keywords").to_pylist() == [True, False, None]